@@ -0,0 +1,273 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, TextIO
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+
+from compression import COMPRESSED_SUFFIXES, compress_file
+from output_writer import OutputWriter
+
+# Expression to capture a `url()` reference in CSS
+# Group 1: Opening quote, if any
+# Group 2: Referenced URL
+CSS_URL_EXPR = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+
+# Expression to capture an `src` or `href` attribute in HTML
+# Group 1: Attribute name and opening quote
+# Group 2: Referenced URL
+HTML_REF_EXPR = re.compile(r"((?:src|href)=\")([^\"]+)\"")
+
+# Expression to capture the parts of a name around the content hash `hashed_name` inserts
+# Group 1: Path before the hash
+# Group 2: Suffix after the hash, if any
+HASHED_NAME_EXPR = re.compile(r"^(.*)\.[0-9a-f]{10}((?:\.[^./]*)?)$")
+
+def walk_files(root: Path) -> list[Path]:
+    """
+        List every file under `root`, relative to it
+    """
+    files = []
+    stack = [Path(root)]
+    while len(stack) > 0:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(Path(entry.path))
+                else:
+                    files.append(Path(entry.path).relative_to(root))
+    return files
+
+def hashed_name(relative: Path, content: bytes) -> Path:
+    """
+        Insert a short content hash before the suffix, such as `images/logo.png` -> `images/logo.1a2b3c4d5e.png`
+    """
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    return relative.with_name(f"{relative.stem}.{digest}{relative.suffix}")
+
+def resolve_reference(reference: str, base: str) -> str | None:
+    """
+        Resolve a URL reference found in a file served at directory `base` to an absolute site path
+
+        Returns None for references to other sites, data URIs and fragments.
+    """
+    if reference.startswith(("http:", "https:", "//", "data:", "#", "mailto:")):
+        return None
+    path = reference.split('#', 1)[0].split('?', 1)[0]
+    if path == "":
+        return None
+    return posixpath.normpath(path if path.startswith('/') else posixpath.join(base, path))
+
+def uncompressed_path(path: Path) -> Path:
+    """
+        Path of the file a precompressed sibling such as `index.html.gz` was compressed from, or `path` itself
+    """
+    for suffix in COMPRESSED_SUFFIXES:
+        if path.name.endswith(suffix):
+            return path.with_name(path.name[:-len(suffix)])
+    return path
+
+class AssetReferences():
+    """
+        Points `src`/`href` attributes in generated HTML at the current hashed names of assets
+
+        References to hashed names from earlier builds are pointed at the current ones too, so pages
+        an incremental build skipped follow assets that changed since they were generated.
+    """
+    def __init__(self, public_path: Path, mapping: dict[str, str]) -> None:
+        self.public_path = Path(public_path)
+        self.mapping = mapping
+
+    def original_path(self, target: str) -> str | None:
+        """
+            Site path in `static/` of `target`, which is either that path itself or a hashed name given to it
+        """
+        if target in self.mapping:
+            return target
+        match = HASHED_NAME_EXPR.match(target)
+        if match is not None and match.group(1) + match.group(2) in self.mapping:
+            return match.group(1) + match.group(2)
+        return None
+
+    def rewrite(self, html: str, page: Path) -> str:
+        """
+            Rewrite the asset references in `html` from the page written to `page`
+        """
+        base = posixpath.dirname('/' + Path(page).relative_to(self.public_path).as_posix())
+
+        def replace(match: re.Match) -> str:
+            target = resolve_reference(match.group(2), base)
+            original = None if target is None else self.original_path(target)
+            if original is None:
+                return match.group(0)
+            return f"{match.group(1)}{self.mapping[original]}\""
+
+        return HTML_REF_EXPR.sub(replace, html)
+
+    def wrap(self, stream: TextIO, page: Path) -> "ReferenceRewritingStream":
+        """
+            Wrap `stream`, which `page` is being written to, so references are rewritten on their way to it
+        """
+        return ReferenceRewritingStream(stream, self, page)
+
+class ReferenceRewritingStream():
+    """
+        Writes HTML to `stream`, rewriting asset references in each chunk as it passes through
+
+        Tags are never split across serialized chunks, but an attribute filled from a template slot is,
+        so a page can still hold references to rewrite once written; `AssetPipeline.rewrite_html` catches those.
+    """
+    def __init__(self, stream: TextIO, references: AssetReferences, page: Path) -> None:
+        self.stream = stream
+        self.references = references
+        self.page = page
+
+    def write(self, text: str) -> int:
+        return self.stream.write(self.references.rewrite(text, self.page))
+
+    def writelines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write(line)
+
+class AssetPipeline():
+    """
+        Copy `static/` into `public/` on a thread pool, optionally renaming files by content hash
+        and writing precompressed siblings of text assets
+
+        With `include`, only those absolute paths of `static/` are copied.
+        Precompression writes each of `formats` for text assets of at least `min_size` bytes.
+
+        With hashing on, `url()` references in CSS are rewritten before the CSS itself is hashed.
+        Pages point at the hashed names through `references`, either as they are written or,
+        for pages written before this run, with `rewrite_html`.
+        Outputs are written atomically and left untouched when unchanged; `prune` removes those of earlier runs.
+    """
+    def __init__(self, static_path: Path, public_path: Path, hash_names: bool = True, compress: bool = False, workers: int | None = None, include: set[Path] | None = None, formats: list[str] | None = None, min_size: int = 0) -> None:
+        self.static_path = Path(static_path)
+        self.public_path = Path(public_path)
+        self.hash_names = hash_names
+        self.compress = compress
+        self.formats = formats
+        self.min_size = min_size
+        self.workers = workers
+        self.include = include
+        self.mapping = {}
+        self.writer = OutputWriter()
+
+    def site_path(self, relative: Path) -> str:
+        return '/' + relative.as_posix()
+
+    def process_file(self, relative: Path, content: bytes | None = None) -> tuple[Path, Path]:
+        source = Path.joinpath(self.static_path, relative)
+        if content is None:
+            with open(source, mode = "rb") as f:
+                content = f.read()
+
+        output_relative = hashed_name(relative, content) if self.hash_names else relative
+        output = Path.joinpath(self.public_path, output_relative)
+        if self.writer.write_bytes(output, content):
+            shutil.copystat(source, output)
+
+        if self.compress:
+            compress_file(output, self.formats, self.min_size, content=content, writer=self.writer)
+        return (relative, output_relative)
+
+    def rewrite_css(self, relative: Path) -> bytes:
+        with open(Path.joinpath(self.static_path, relative)) as f:
+            css = f.read()
+        base = posixpath.dirname(self.site_path(relative))
+
+        def replace(match: re.Match) -> str:
+            target = resolve_reference(match.group(2), base)
+            if target is None or target not in self.mapping:
+                return match.group(0)
+            return f"url({match.group(1)}{self.mapping[target]}{match.group(1)})"
+
+        return CSS_URL_EXPR.sub(replace, css).encode()
+
+    def run(self) -> dict[str, str]:
+        """
+            Process every file in `static/`, returning the mapping of original to output site paths
+        """
+        files = walk_files(self.static_path)
+        if self.include is not None:
+            files = [ relative for relative in files if Path.joinpath(self.static_path, relative) in self.include ]
+        stylesheets = [ relative for relative in files if relative.suffix == ".css" ]
+        others = [ relative for relative in files if relative.suffix != ".css" ]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for (relative, output_relative) in executor.map(self.process_file, others):
+                self.mapping[self.site_path(relative)] = self.site_path(output_relative)
+
+            # Stylesheets go last, since their hash depends on the rewritten references to other assets
+            contents = [ self.rewrite_css(relative) if self.hash_names else None for relative in stylesheets ]
+            for (relative, output_relative) in executor.map(self.process_file, stylesheets, contents):
+                self.mapping[self.site_path(relative)] = self.site_path(output_relative)
+
+        if self.hash_names:
+            with self.writer.open(Path.joinpath(self.public_path, "asset-manifest.json")) as f:
+                json.dump(self.mapping, f, indent=1, sort_keys=True)
+        return self.mapping
+
+    def references(self) -> AssetReferences | None:
+        """
+            Rewriter pointing pages at this run's hashed names, or None when names are not hashed
+        """
+        if not self.hash_names:
+            return None
+        return AssetReferences(self.public_path, self.mapping)
+
+    def prune(self, keep: set[Path], hashed_only: bool = False) -> list[Path]:
+        """
+            Remove the files in `public/` that this run did not write, returning them
+
+            Paths in `keep`, such as generated pages, are left alone, as are the precompressed siblings
+            of those and of this run's outputs. With `hashed_only`, only files with a hashed name are removed,
+            such as older versions of assets; otherwise emptied directories are removed too, as a clean build would.
+        """
+        if not self.public_path.exists():
+            return []
+        outputs = keep | { Path.joinpath(self.public_path, target.lstrip('/')) for target in self.mapping.values() }
+        if self.hash_names:
+            outputs.add(Path.joinpath(self.public_path, "asset-manifest.json"))
+
+        removed = []
+        for relative in walk_files(self.public_path):
+            path = Path.joinpath(self.public_path, relative)
+            if path in outputs or uncompressed_path(path) in outputs:
+                continue
+            if hashed_only and HASHED_NAME_EXPR.match(uncompressed_path(relative).as_posix()) is None:
+                continue
+            path.unlink()
+            removed.append(path)
+
+        if not hashed_only:
+            for (directory, _, _) in os.walk(self.public_path, topdown=False):
+                if directory != os.fspath(self.public_path) and len(os.listdir(directory)) == 0:
+                    os.rmdir(directory)
+        return removed
+
+    def rewrite_html(self, pages: list[Path]) -> list[Path]:
+        """
+            Point asset references in the generated `pages` at their current hashed names, returning the pages changed
+        """
+        references = self.references()
+        if references is None:
+            return []
+
+        def rewrite(page: Path) -> bool:
+            with open(page) as f:
+                html = f.read()
+            rewritten = references.rewrite(html, page)
+            if rewritten == html:
+                return False
+            with self.writer.open(page) as f:
+                f.write(rewritten)
+            return True
+
+        pages = [ page for page in pages if page.exists() ]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return [ page for (page, changed) in zip(pages, executor.map(rewrite, pages)) if changed ]
@@ -0,0 +1,85 @@
+"""
+    Generate synthetic markdown corpora for benchmarking the build pipeline
+"""
+from pathlib import Path
+import random
+
+SHAPES = ["paragraph", "list", "code", "linked", "mixed"]
+
+WORDS = "the fellowship of ring travelled through misty mountains towards rivendell where elves kept ancient lore and songs".split()
+
+def sentence(rng: random.Random, links: int = 0) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 16))]
+    if rng.random() < 0.3:
+        words[rng.randrange(len(words))] = f"**{rng.choice(WORDS)}**"
+    if rng.random() < 0.3:
+        words[rng.randrange(len(words))] = f"*{rng.choice(WORDS)}*"
+    if rng.random() < 0.2:
+        words[rng.randrange(len(words))] = f"`{rng.choice(WORDS)}`"
+    for _ in range(links):
+        target = rng.choice(WORDS)
+        words[rng.randrange(len(words))] = f"[{target}](/{target}/{rng.randint(0, 999)})"
+    return ' '.join(words).capitalize() + '.'
+
+def title(rng: random.Random) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).capitalize()
+
+def paragraph_block(rng: random.Random, links: int = 0) -> str:
+    return ' '.join(sentence(rng, links) for _ in range(rng.randint(2, 5)))
+
+def list_block(rng: random.Random) -> str:
+    # Start each item with a plain word, since list markers are stripped along with any leading `*`
+    items = [f"{rng.choice(WORDS)} {sentence(rng)}" for _ in range(rng.randint(3, 12))]
+    if rng.random() < 0.5:
+        return '\n'.join(f"* {item}" for item in items)
+    return '\n'.join(f"{i}. {item}" for (i, item) in enumerate(items, 1))
+
+def code_block(rng: random.Random) -> str:
+    lines = [f"{rng.choice(WORDS)} = {rng.choice(WORDS)}({rng.randint(0, 99)})" for _ in range(rng.randint(3, 15))]
+    return "```\n" + '\n'.join(lines) + "\n```"
+
+def block(rng: random.Random, shape: str) -> str:
+    """
+        Generate one block, weighted towards the kind that dominates `shape`
+    """
+    roll = rng.random()
+    match shape:
+        case "paragraph":
+            return paragraph_block(rng) if roll < 0.9 else list_block(rng)
+        case "list":
+            return list_block(rng) if roll < 0.8 else paragraph_block(rng)
+        case "code":
+            return code_block(rng) if roll < 0.7 else paragraph_block(rng)
+        case "linked":
+            return paragraph_block(rng, links=4)
+        case "mixed":
+            if roll < 0.1:
+                return f"## {title(rng)}"
+            if roll < 0.2:
+                return '\n'.join(f"> {sentence(rng)}" for _ in range(rng.randint(1, 3)))
+            if roll < 0.4:
+                return list_block(rng)
+            if roll < 0.5:
+                return code_block(rng)
+            return paragraph_block(rng, links=rng.randint(0, 2))
+        case _:
+            raise ValueError(f"Unknown corpus shape `{shape}`, expected one of {SHAPES}")
+
+def generate_markdown(shape: str = "mixed", blocks: int = 50, seed: int = 0) -> str:
+    """
+        Generate a markdown document with a title and `blocks` further blocks of the given shape
+    """
+    rng = random.Random(seed)
+    return '\n\n'.join([f"# {title(rng)}"] + [block(rng, shape) for _ in range(blocks)]) + '\n'
+
+def write_corpus(root: str, pages: int = 100, shape: str = "mixed", blocks: int = 50, seed: int = 0) -> list[Path]:
+    """
+        Write `pages` generated markdown files under `root`, spread over nested directories
+    """
+    paths = []
+    for page in range(pages):
+        path = Path.joinpath(Path(root), f"section{page % 10}", f"page{page}.md")
+        path.parent.mkdir(exist_ok=True, parents=True)
+        path.write_text(generate_markdown(shape, blocks, seed + page))
+        paths.append(path)
+    return paths
@@ -0,0 +1,30 @@
+"""
+    Compare the single-pass inline tokenizer with the previous chain of split passes
+
+    Run from `src/`: python3 -m benchmarks.inline_tokenizer
+"""
+import timeit
+
+from parsers import split_text_to_textnodes, text_to_textnodes
+
+SEGMENT = "Plain words with **bold text** and *italic text*, a `code span`, an ![image](/images/a.png) and a [link](/docs/page). "
+
+def run(sizes: list[int] = [10, 100, 1000], repeat: int = 5) -> list[dict]:
+    results = []
+    for size in sizes:
+        text = SEGMENT * size
+        if split_text_to_textnodes(text) != text_to_textnodes(text):
+            raise AssertionError(f"Tokenizer output differs from chained passes for {size} segments")
+
+        number = max(1, 1000 // size)
+        chained = min(timeit.repeat(lambda: split_text_to_textnodes(text), number=number, repeat=repeat)) / number
+        single = min(timeit.repeat(lambda: text_to_textnodes(text), number=number, repeat=repeat)) / number
+        results.append({ "segments": size, "chars": len(text), "chained_s": chained, "single_pass_s": single, "speedup": chained / single })
+    return results
+
+def main():
+    for result in run():
+        print(f"{result['segments']:>6} segments ({result['chars']:>7} chars): chained {result['chained_s'] * 1000:9.3f} ms, single pass {result['single_pass_s'] * 1000:9.3f} ms, {result['speedup']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+    Compare link and image splitting by match offsets with the previous reformat-and-split approach
+    on link-dense text, such as an API index with thousands of links on one line
+
+    Run from `src/`: python3 -m benchmarks.link_splitting
+"""
+import timeit
+
+from parsers import extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link
+from textnode import TextNode, TextType
+
+SEGMENT = "See [method {n}](/api/method-{n}.html) and its diagram ![call graph {n}](/images/graph-{n}.png), "
+
+def reformatted_split(old_nodes: list[TextNode], extract, template: str, text_type: TextType) -> list[TextNode]:
+    """
+        The previous implementation: rebuild each match's markdown and split the remaining string on it
+    """
+    nodes = []
+    for node in old_nodes:
+        if not node.text_type == TextType.TEXT:
+            nodes.append(node)
+            continue
+
+        remainder = node.text
+        for (text, url) in extract(node.text):
+            [pre_text, remainder] = remainder.split(template.format(text, url), 1)
+            if len(pre_text) > 0:
+                nodes.append(TextNode(pre_text, TextType.TEXT))
+            nodes.append(TextNode(text, text_type, url))
+
+        if len(remainder) > 0:
+            nodes.append(TextNode(remainder, TextType.TEXT))
+    return nodes
+
+def reformatted_split_images_and_links(nodes: list[TextNode]) -> list[TextNode]:
+    nodes = reformatted_split(nodes, extract_markdown_images, "![{}]({})", TextType.IMAGE)
+    return reformatted_split(nodes, extract_markdown_links, "[{}]({})", TextType.LINK)
+
+def offset_split_images_and_links(nodes: list[TextNode]) -> list[TextNode]:
+    return split_nodes_link(split_nodes_image(nodes))
+
+def link_dense_text(links: int) -> str:
+    return ''.join(SEGMENT.format(n=n) for n in range(links))
+
+def run(sizes: list[int] = [100, 1000, 5000], repeat: int = 5) -> list[dict]:
+    results = []
+    for size in sizes:
+        nodes = [TextNode(link_dense_text(size), TextType.TEXT)]
+        if reformatted_split_images_and_links(nodes) != offset_split_images_and_links(nodes):
+            raise AssertionError(f"Offset splitting differs from reformat-and-split for {size} links")
+
+        number = max(1, 1000 // size)
+        reformatted = min(timeit.repeat(lambda: reformatted_split_images_and_links(nodes), number=number, repeat=repeat)) / number
+        offsets = min(timeit.repeat(lambda: offset_split_images_and_links(nodes), number=number, repeat=repeat)) / number
+        results.append({ "links": size, "chars": len(nodes[0].text), "reformatted_s": reformatted, "offsets_s": offsets, "speedup": reformatted / offsets })
+    return results
+
+def main():
+    for result in run():
+        print(f"{result['links']:>6} links ({result['chars']:>7} chars): reformat-and-split {result['reformatted_s'] * 1000:9.3f} ms, offsets {result['offsets_s'] * 1000:9.3f} ms, {result['speedup']:.1f}x")
+
+if __name__ == "__main__":
+    main()
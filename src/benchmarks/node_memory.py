@@ -0,0 +1,78 @@
+"""
+    Measure the memory used by text and HTML nodes for a large corpus, compared with `__dict__`-based nodes
+
+    Each variant runs in a fresh process so peak RSS is not shared between them.
+
+    Run from `src/`: python3 -m benchmarks.node_memory
+"""
+from concurrent.futures import ProcessPoolExecutor
+import resource
+import tracemalloc
+
+from converters.text_node_converters import text_node_to_html_node
+from parsers import text_to_textnodes
+
+PARAGRAPH = "Plain words with **bold text** and *italic text*, a `code span`, an ![image](/images/a.png) and a [link](/docs/page). "
+
+class DictTextNode():
+    def __init__(self, text, text_type, url = None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+class DictLeafNode():
+    def __init__(self, tag, value, props = None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+def build_slots(paragraphs: int) -> list:
+    nodes = []
+    for _ in range(paragraphs):
+        for text_node in text_to_textnodes(PARAGRAPH):
+            nodes.append((text_node, text_node_to_html_node(text_node)))
+    return nodes
+
+def build_dict(paragraphs: int) -> list:
+    nodes = []
+    for _ in range(paragraphs):
+        for text_node in text_to_textnodes(PARAGRAPH):
+            # Rebuild each node as a `__dict__` instance, as the node classes used to be
+            legacy = DictTextNode(text_node.text, text_node.text_type, text_node.url)
+            html = text_node_to_html_node(text_node)
+            nodes.append((legacy, DictLeafNode(html.tag, html.value, html.props)))
+    return nodes
+
+def measure(variant: str, paragraphs: int) -> dict:
+    build = build_slots if variant == "slots" else build_dict
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    nodes = build(paragraphs)
+    (current, peak) = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "variant": variant,
+        "nodes": len(nodes) * 2,
+        "traced_peak_bytes": peak,
+        "live_blocks": blocks,
+        "peak_rss_growth_kb": rss_after - rss_before,
+    }
+
+def run(paragraphs: int = 20000) -> list[dict]:
+    results = []
+    for variant in ["dict", "slots"]:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results.append(executor.submit(measure, variant, paragraphs).result())
+    return results
+
+def main():
+    for result in run():
+        print(f"{result['variant']:>5}: {result['nodes']} nodes, traced peak {result['traced_peak_bytes'] / 1e6:.1f} MB, {result['live_blocks']} live allocations, peak RSS +{result['peak_rss_growth_kb'] / 1024:.1f} MB")
+
+if __name__ == "__main__":
+    main()
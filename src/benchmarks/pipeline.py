@@ -0,0 +1,118 @@
+"""
+    Time each stage of the build pipeline on a synthetic corpus and report the results as JSON
+
+    Run from `src/`:
+        python3 -m benchmarks.pipeline --pages 200 --shape mixed --output results.json
+        python3 -m benchmarks.pipeline --baseline results.json --tolerance 0.2
+"""
+from contextlib import redirect_stdout
+from pathlib import Path
+import argparse
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import SHAPES, generate_markdown, write_corpus
+from converters.html_converters import markdown_to_html_node
+from converters.text_node_converters import text_node_to_html_node
+from inline_cache import inline_cache
+from main import generate_pages_recursive
+from markdown_blocks import BlockType, block_to_block_type, markdown_to_blocks
+from parsers import text_to_textnodes
+
+TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+
+def best_time(stage, repeat: int) -> float:
+    """
+        Run `stage` `repeat` times, returning the fastest run in seconds
+
+        The process-wide inline cache is cleared before each run, so every run renders from cold.
+    """
+    times = []
+    for _ in range(repeat):
+        inline_cache.clear()
+        start = time.perf_counter()
+        stage()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def run(pages: int = 100, shape: str = "mixed", blocks: int = 50, repeat: int = 3, seed: int = 0) -> dict:
+    """
+        Time every pipeline stage over the same generated documents
+    """
+    documents = [generate_markdown(shape, blocks, seed + page) for page in range(pages)]
+    all_blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    inline_blocks = [block for block in all_blocks if block_to_block_type(block) == BlockType.PARAGRAPH]
+    text_nodes = [node for block in inline_blocks for node in text_to_textnodes(block)]
+    trees = [markdown_to_html_node(document) for document in documents]
+
+    stages = {
+        "markdown_to_blocks": lambda: [markdown_to_blocks(document) for document in documents],
+        "block_to_block_type": lambda: [block_to_block_type(block) for block in all_blocks],
+        "text_to_textnodes": lambda: [text_to_textnodes(block) for block in inline_blocks],
+        "text_node_to_html_node": lambda: [text_node_to_html_node(node) for node in text_nodes],
+        "markdown_to_html_node": lambda: [markdown_to_html_node(document) for document in documents],
+        "to_html": lambda: [tree.to_html() for tree in trees],
+    }
+    results = { name: best_time(stage, repeat) for (name, stage) in stages.items() }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_corpus(root / "content", pages, shape, blocks, seed)
+        (root / "template.html").write_text(TEMPLATE)
+        with redirect_stdout(io.StringIO()):
+            results["generate_pages_recursive"] = best_time(lambda: generate_pages_recursive(root / "content", root / "template.html", root / "public"), repeat)
+
+    return {
+        "config": { "pages": pages, "shape": shape, "blocks": blocks, "repeat": repeat, "seed": seed },
+        "environment": { "python": platform.python_version(), "machine": platform.machine() },
+        "counts": { "bytes": sum(len(document) for document in documents), "blocks": len(all_blocks), "inline_blocks": len(inline_blocks), "text_nodes": len(text_nodes) },
+        "seconds": results,
+    }
+
+def find_regressions(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+        List the stages that got more than `tolerance` (a fraction) slower than in `baseline`
+    """
+    regressions = []
+    for (stage, seconds) in current["seconds"].items():
+        previous = baseline["seconds"].get(stage)
+        if previous is not None and seconds > previous * (1 + tolerance):
+            regressions.append(f"{stage}: {previous * 1000:.2f} ms -> {seconds * 1000:.2f} ms (+{(seconds / previous - 1) * 100:.0f}%)")
+    return regressions
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the build pipeline")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--blocks", type=int, default=50, help="blocks per generated page")
+    parser.add_argument("--shape", choices=SHAPES, default="mixed")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown per stage before failing, as a fraction")
+    args = parser.parse_args(argv)
+
+    results = run(args.pages, args.shape, args.blocks, args.repeat, args.seed)
+
+    if args.output:
+        with open(args.output, mode = "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression in {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import unittest
+
+from benchmarks.corpus import SHAPES, generate_markdown
+from benchmarks.pipeline import find_regressions, run
+from converters.html_converters import markdown_to_html_node
+from markdown_blocks import extract_title
+
+class TestCorpus(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(generate_markdown("mixed", 20, seed=3), generate_markdown("mixed", 20, seed=3))
+
+    def test_shapes_render(self):
+        for shape in SHAPES:
+            markdown = generate_markdown(shape, 30)
+            extract_title(markdown)
+            markdown_to_html_node(markdown).to_html()
+
+    def test_unknown_shape(self):
+        with self.assertRaises(ValueError):
+            generate_markdown("tables")
+
+class TestPipelineBenchmark(unittest.TestCase):
+    def test_run(self):
+        results = run(pages=2, blocks=5, repeat=1)
+        self.assertIn("generate_pages_recursive", results["seconds"])
+        self.assertEqual(results["config"]["pages"], 2)
+
+    def test_find_regressions(self):
+        baseline = { "seconds": { "to_html": 1.0, "markdown_to_blocks": 1.0 } }
+        current = { "seconds": { "to_html": 1.5, "markdown_to_blocks": 1.1, "new_stage": 9.0 } }
+        regressions = find_regressions(current, baseline, 0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("to_html"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+from pathlib import Path
+import hashlib
+import sqlite3
+import time
+
+# Modules whose code decides how a block renders; editing any of them invalidates the cache
+RENDERER_MODULES = [
+    "converters/html_converters.py",
+    "converters/text_node_converters.py",
+    "htmlnode.py",
+    "image_size.py",
+    "inline_cache.py",
+    "markdown_blocks.py",
+    "parsers.py",
+    "textnode.py",
+]
+
+def renderer_version() -> str:
+    """
+        Hash the source of the renderer modules, so cached HTML never outlives the code that produced it
+    """
+    digest = hashlib.sha256()
+    root = Path(__file__).parent
+    for module in RENDERER_MODULES:
+        digest.update(Path.joinpath(root, module).read_bytes())
+    return digest.hexdigest()
+
+class BlockCache():
+    """
+        Content-addressed SQLite store mapping the hash of a markdown block to its rendered HTML
+
+        Entries are evicted least recently used first once the stored HTML exceeds `max_bytes`.
+        Reads and writes are buffered until `commit`, which also applies eviction.
+        The size of the stored HTML is summed once when the database is opened and kept as a running total;
+        entries other processes added are picked up when that total next crosses the limit.
+        The database is opened lazily, so the cache can be passed to worker processes.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, version: str | None = None) -> None:
+        self.path = Path.joinpath(Path(cache_dir), "blocks.sqlite3")
+        self.max_bytes = max_bytes
+        self.version = renderer_version() if version is None else version
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._total = 0
+        self._used = set()
+        self._pending = {}
+
+    def __getstate__(self) -> dict:
+        return { "path": self.path, "max_bytes": self.max_bytes, "version": self.version }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"].parent, state["max_bytes"], state["version"])
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+            # Several build processes may share the cache, so wait for locks rather than failing
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS blocks (hash TEXT PRIMARY KEY, html TEXT, size INTEGER, last_used REAL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS blocks_last_used ON blocks (last_used)")
+
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                self._connection.execute("DELETE FROM blocks")
+                self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+            self._connection.commit()
+            self._total = self._stored_size()
+        return self._connection
+
+    def _stored_size(self) -> int:
+        (total,) = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()
+        return total
+
+    def key(self, block: str) -> str:
+        return hashlib.sha256(block.encode()).hexdigest()
+
+    def get(self, block: str) -> str | None:
+        key = self.key(block)
+        html = self._pending.get(key)
+        if html is None:
+            row = self.connection.execute("SELECT html FROM blocks WHERE hash = ?", (key,)).fetchone()
+            html = None if row is None else row[0]
+
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.add(key)
+        return html
+
+    def put(self, block: str, html: str) -> None:
+        self._pending[self.key(block)] = html
+
+    def commit(self) -> None:
+        """
+            Write buffered entries and access times, then evict entries over the size limit
+        """
+        if len(self._pending) == 0 and len(self._used) == 0:
+            return
+
+        now = time.time()
+        connection = self.connection
+        for (key, html) in self._pending.items():
+            size = len(html.encode())
+            # Entries are addressed by content, so a row another process already stored is the same HTML
+            if connection.execute("INSERT OR IGNORE INTO blocks VALUES (?, ?, ?, ?)", (key, html, size, now)).rowcount > 0:
+                self._total += size
+        connection.executemany("UPDATE blocks SET last_used = ? WHERE hash = ?", [ (now, key) for key in self._used | self._pending.keys() ])
+        self._pending.clear()
+        self._used.clear()
+
+        if self._total > self.max_bytes:
+            # Other processes may have added or evicted entries since, so recount before evicting
+            self._total = self._stored_size()
+        if self._total > self.max_bytes:
+            excess = self._total - self.max_bytes
+            evicted = []
+            for (key, size) in connection.execute("SELECT hash, size FROM blocks ORDER BY last_used"):
+                if excess <= 0:
+                    break
+                evicted.append((key,))
+                excess -= size
+                self._total -= size
+            connection.executemany("DELETE FROM blocks WHERE hash = ?", evicted)
+        connection.commit()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self.commit()
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import gzip
+
+from output_writer import OutputWriter
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Text outputs worth storing precompressed next to the original
+COMPRESSIBLE_SUFFIXES = { ".html", ".css", ".js", ".svg", ".json", ".txt", ".xml", ".map" }
+
+# File suffix and compressor for each format; gzip is always available, the others are optional extras
+COMPRESSORS = {
+    "gzip": (".gz", lambda content: gzip.compress(content, compresslevel=9, mtime=0)),
+}
+if brotli is not None:
+    COMPRESSORS["br"] = (".br", lambda content: brotli.compress(content))
+if zstandard is not None:
+    COMPRESSORS["zstd"] = (".zst", lambda content: zstandard.ZstdCompressor(level=19).compress(content))
+
+# Suffixes of precompressed siblings in any format, including ones unavailable to this build
+COMPRESSED_SUFFIXES = (".gz", ".br", ".zst")
+
+def compressed_siblings(path: Path, formats: list[str] | None = None) -> list[Path]:
+    """
+        List the precompressed files that would be written next to `path`
+    """
+    formats = list(COMPRESSORS) if formats is None else formats
+    return [ path.with_name(path.name + COMPRESSORS[name][0]) for name in formats ]
+
+def compress_file(path: Path, formats: list[str] | None = None, min_size: int = 0, content: bytes | None = None, writer: OutputWriter | None = None) -> list[Path]:
+    """
+        Write a compressed sibling of `path` for each of `formats` (every available one by default)
+
+        Files without a compressible suffix are skipped. Files smaller than `min_size` bytes are skipped too,
+        removing any siblings left from a build where they were larger. Returns the siblings written.
+        Siblings whose compressed bytes are unchanged are left untouched.
+    """
+    path = Path(path)
+    if path.suffix not in COMPRESSIBLE_SUFFIXES:
+        return []
+    if content is None:
+        content = path.read_bytes()
+
+    formats = list(COMPRESSORS) if formats is None else formats
+    if len(content) < min_size:
+        for sibling in compressed_siblings(path, formats):
+            sibling.unlink(missing_ok=True)
+        return []
+
+    writer = OutputWriter() if writer is None else writer
+    written = []
+    for name in formats:
+        (suffix, compress) = COMPRESSORS[name]
+        sibling = path.with_name(path.name + suffix)
+        writer.write_bytes(sibling, compress(content))
+        written.append(sibling)
+    return written
+
+class OutputCompressor():
+    """
+        Compresses build outputs on a thread pool so compression overlaps with rendering
+
+        zlib and the optional compressors release the GIL, so threads run in parallel with the build.
+        Inside worker processes of a parallel build, files are compressed inline instead,
+        since pages are already spread over processes there.
+    """
+    def __init__(self, formats: list[str] | None = None, min_size: int = 1024, workers: int | None = None) -> None:
+        self.formats = list(COMPRESSORS) if formats is None else formats
+        for name in self.formats:
+            if name not in COMPRESSORS:
+                raise ValueError(f"Compression format `{name}` is unavailable, expected one of {list(COMPRESSORS)}")
+        self.min_size = min_size
+        self.workers = workers
+        self.synchronous = False
+        self._executor = None
+        self._futures = []
+
+    def __getstate__(self) -> dict:
+        return { "formats": self.formats, "min_size": self.min_size }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["formats"], state["min_size"])
+        self.synchronous = True
+
+    def submit(self, path: Path) -> None:
+        if self.synchronous:
+            compress_file(path, self.formats, self.min_size)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._futures.append(self._executor.submit(compress_file, path, self.formats, self.min_size))
+
+    def wait(self) -> list[Path]:
+        """
+            Block until every submitted file is compressed, returning the siblings written
+        """
+        written = []
+        futures = self._futures
+        self._futures = []
+        for future in futures:
+            written.extend(future.result())
+        return written
+
+    def close(self) -> None:
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -1,44 +1,97 @@
-from htmlnode import ParentNode
-from markdown_blocks import markdown_to_blocks, BlockType, block_to_block_type, block_to_heading, block_to_code, block_to_ordered_list, block_to_paragraph, block_to_quote, block_to_unordered_list
+from typing import Iterable, Iterator
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
+from block_cache import BlockCache
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from image_size import image_markup
+from profiler import profiler
+from markdown_blocks import Block, scan_blocks, BlockType, block_to_heading, block_to_code, block_to_ordered_list, block_to_paragraph, block_to_quote, block_to_unordered_list
+
+def markdown_to_html_node(markdown: str, cache: BlockCache | None = None) -> ParentNode:
     """
         Converts an entire markdown file to an HTML file body.
 
         Note: Does not include `body` tag, top-level is `div`.
 
+        With a `cache`, blocks rendered before are returned as raw HTML leaves instead of being parsed again.
+
         Input:
             markdown: string, a markdown file text
         Output:
             A `div` HTML node with the parsed file contents as its children
     """
-    nodes = []
+    (blocks, _) = scan_blocks(markdown)
+    return blocks_to_html_node(blocks, cache)
+
+def markdown_to_page(markdown: str, cache: BlockCache | None = None) -> tuple[str, ParentNode]:
+    """
+        Converts an entire markdown file to its title and HTML body in a single scan of the document.
+
+        Input:
+            markdown: string, a markdown file text
+        Output:
+            The text of the first H1-level heading, and a `div` HTML node with the parsed file contents
+    """
+    (blocks, title) = scan_blocks(markdown)
+    if title is None:
+        raise ValueError("Markdown provided contains no H1-level heading")
+    return (title, blocks_to_html_node(blocks, cache))
+
+def block_to_html_node(block: Block) -> ParentNode:
+    """
+        Converts one classified markdown block to its HTML node.
+    """
+    match block.block_type:
+        case BlockType.PARAGRAPH:
+            return block_to_paragraph(block.text)
+        case BlockType.HEADING:
+            return block_to_heading(block.text, block.level)
+        case BlockType.CODE:
+            return block_to_code(block.text)
+        case BlockType.QUOTE:
+            return block_to_quote(block.text)
+        case BlockType.UNORDERED_LIST:
+            return block_to_unordered_list(block.text, block.items)
+        case BlockType.ORDERED_LIST:
+            return block_to_ordered_list(block.text, block.items)
+        case _:
+            raise NotImplementedError(f"Block type `{block.block_type}` has not been implemented yet!")
 
-    blocks = markdown_to_blocks(markdown)
+def iter_block_nodes(blocks: Iterable[Block], cache: BlockCache | None = None) -> Iterator[HTMLNode]:
+    """
+        Lazily converts classified markdown blocks to HTML nodes, one block at a time.
 
+        With a `cache`, a block's HTML is looked up by its text first, and misses are rendered and stored.
+        Blocks with images bypass the cache while `image_markup` is enabled, since their dimensions follow the image file.
+    """
     for block in blocks:
+        if cache is None or (image_markup.enabled and "![" in block.text):
+            node = block_to_html_node(block)
+        else:
+            html = cache.get(block.text)
+            if html is None:
+                html = block_to_html_node(block).to_html()
+                cache.put(block.text, html)
+            elif profiler.enabled:
+                profiler.add("block_cache.hits")
+            node = LeafNode(None, html)
 
-        block_type = block_to_block_type(block)
-
-        match block_type:
-            case BlockType.PARAGRAPH:
-                nodes.append(block_to_paragraph(block))
-                continue
-            case BlockType.HEADING:
-                nodes.append(block_to_heading(block))
-                continue
-            case BlockType.CODE:
-                nodes.append(block_to_code(block))
-                continue
-            case BlockType.QUOTE:
-                nodes.append(block_to_quote(block))
-                continue
-            case BlockType.UNORDERED_LIST:
-                nodes.append(block_to_unordered_list(block))
-                continue
-            case BlockType.ORDERED_LIST:
-                nodes.append(block_to_ordered_list(block))
-                continue
-            case _:
-                raise NotImplementedError(f"Block type `{block_type}` has not been implemented yet!")
-    return ParentNode('div', nodes)
\ No newline at end of file
+        if profiler.enabled:
+            profiler.add(f"blocks.{node.tag}")
+        yield node
+
+    if cache is not None:
+        cache.commit()
+
+def blocks_to_html_node(blocks: Iterable[Block], cache: BlockCache | None = None) -> ParentNode:
+    """
+        Converts classified markdown blocks to a `div` HTML node with one child per block.
+    """
+    return ParentNode('div', list(iter_block_nodes(blocks, cache)))
+
+def stream_blocks_to_html_node(blocks: Iterable[Block], cache: BlockCache | None = None) -> ParentNode:
+    """
+        Converts classified markdown blocks to a `div` HTML node whose children are produced while it is serialized.
+
+        Only the block being rendered is held in memory, so the node can be serialized only once.
+    """
+    return ParentNode('div', iter_block_nodes(blocks, cache))
@@ -1,9 +1,10 @@
 import unittest
 
-from converters.html_converters import block_to_block_type, BlockType, markdown_to_html_node
+from converters.html_converters import BlockType, markdown_to_html_node
 from converters.text_node_converters import text_node_to_html_node
 from textnode import TextNode, TextType
 from htmlnode import ParentNode, LeafNode
+from markdown_blocks import block_to_block_type
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text(self):
@@ -1,5 +1,6 @@
 from textnode import TextNode, TextType
 from htmlnode import HTMLNode, LeafNode
+from image_size import image_markup
 
 def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
     match text_node.text_type:
@@ -14,4 +15,7 @@ def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
         case TextType.LINK:
             return LeafNode('a', text_node.text, props={ "href": text_node.url})
         case TextType.IMAGE:
-            return LeafNode('img', "", props={ "src": text_node.url, "alt": text_node.text })
\ No newline at end of file
+            props = { "src": text_node.url, "alt": text_node.text }
+            if image_markup.enabled:
+                props.update(image_markup.attributes(text_node.url))
+            return LeafNode('img', "", props=props)
\ No newline at end of file
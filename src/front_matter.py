@@ -0,0 +1,98 @@
+from itertools import chain
+from typing import Iterable, Iterator
+import re
+
+FRONT_MATTER_DELIMITER = "---"
+
+# Expression to capture a `key: value` line of front matter
+# Group 1: Key
+# Group 2: Value, possibly empty when a list of `- item` lines follows
+FIELD_EXPR = re.compile(r"^([A-Za-z_][\w-]*)\s*:\s*(.*)$")
+
+# Expression to capture an item of a block list, such as `  - item`
+# Group 1: Item value
+LIST_ITEM_EXPR = re.compile(r"^\s+-\s+(.*)$|^-\s+(.*)$")
+
+def parse_value(text: str) -> str | int | bool | list:
+    """
+        Convert a scalar or inline list (`[a, b]`) of front matter to its Python value
+    """
+    text = text.strip()
+    if text.startswith('[') and text.endswith(']'):
+        return [ parse_value(item) for item in text[1:-1].split(',') if item.strip() != "" ]
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text in ("true", "false"):
+        return text == "true"
+    if re.fullmatch(r"-?\d+", text):
+        return int(text)
+    return text
+
+def parse_front_matter(lines: Iterable[str]) -> dict:
+    """
+        Parse the lines between the front matter delimiters into a dictionary
+
+        Supports `key: value` pairs, inline lists, block lists of `- item` lines and `#` comments.
+    """
+    metadata = {}
+    # Key whose value was left empty, so the `- item` lines that follow belong to it
+    list_key = None
+    for (number, line) in enumerate(lines, start=1):
+        line = line.rstrip()
+        if line.strip() == "" or line.lstrip().startswith('#'):
+            continue
+
+        item = LIST_ITEM_EXPR.match(line)
+        if item and list_key is not None:
+            if metadata[list_key] == "":
+                metadata[list_key] = []
+            metadata[list_key].append(parse_value(item.group(1) if item.group(1) is not None else item.group(2)))
+            continue
+
+        field = FIELD_EXPR.match(line)
+        if field is None:
+            raise ValueError(f"Front matter line {number} `{line}` is not a `key: value` pair")
+        value = field.group(2).strip()
+        metadata[field.group(1)] = parse_value(value) if value != "" else ""
+        list_key = field.group(1) if value == "" else None
+    return metadata
+
+def read_front_matter(lines: Iterable[str]) -> tuple[dict, Iterator[str]]:
+    """
+        Read front matter from the start of `lines`, returning it with an iterator over the remaining body lines
+
+        Only the header is consumed, so the body of a file object can still be streamed afterwards.
+        Documents that do not open with `---` have empty front matter and are returned whole.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return ({}, iter(()))
+    if first.rstrip() != FRONT_MATTER_DELIMITER:
+        return ({}, chain([first], lines))
+
+    header = []
+    for line in lines:
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            return (parse_front_matter(header), lines)
+        header.append(line)
+    raise ValueError("Front matter is missing its closing `---`")
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """
+        Separate the front matter of a markdown document from its body
+    """
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return ({}, markdown)
+    (metadata, body) = read_front_matter(markdown.split('\n'))
+    return (metadata, '\n'.join(body))
+
+def template_value(value: str | int | bool | list) -> str:
+    """
+        Format a front matter value for a template slot
+    """
+    if isinstance(value, list):
+        return ", ".join(template_value(item) for item in value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
@@ -1,9 +1,16 @@
-from typing import Self
+from typing import Iterator, Self, TextIO
 from enum import Enum
+import sys
+
+from profiler import profiled
 
 class HTMLNode():
+    # Nodes are created for every inline span of every page, so skip the per-instance `__dict__`
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag: str | None = None, value: str | None = None, children: list[Self] | None = None, props: dict | None = None) -> None:
-        self.tag = tag
+        # Interning lets every node with the same tag share one string
+        self.tag = tag if tag is None else sys.intern(tag)
         self.value = value
         self.children = children
         self.props = props
@@ -11,6 +18,19 @@ class HTMLNode():
     def to_html(self) -> None:
         raise NotImplementedError()
 
+    def iter_html(self) -> Iterator[str]:
+        """
+            Generate the node's HTML as a sequence of string chunks
+        """
+        yield self.to_html()
+
+    @profiled("html_serialization")
+    def write_html(self, stream: TextIO) -> None:
+        """
+            Write the node's HTML to `stream` chunk by chunk, without building the whole string
+        """
+        stream.writelines(self.iter_html())
+
     def props_to_html(self) -> str:
         return "" if self.props is None else ' ' + ' '.join(map(lambda x: f"{x}=\"{self.props[x]}\"", self.props))
     
@@ -25,6 +45,8 @@ class HTMLNode():
         return f"<{self.tag}{self.props_to_html()}>{content}</{self.tag}>"
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str | None, value: str, props: dict | None = None) -> None:
         super().__init__(tag, value, props=props)
 
@@ -38,14 +60,42 @@ class LeafNode(HTMLNode):
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list[HTMLNode], props: dict | None = None):
         super().__init__(tag, children=children, props=props)
 
-    def to_html(self):
+    def open_tag(self) -> str:
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         if self.children is None:
             raise ValueError("ParentNode must have children")
-        
-        children = "" if len(self.children) == 0 else ''.join([child.to_html() for child in self.children])
-        return f"<{self.tag}{self.props_to_html()}>{children}</{self.tag}>"
\ No newline at end of file
+
+        return f"<{self.tag}{self.props_to_html()}>"
+
+    @profiled("html_serialization")
+    def to_html(self):
+        return ''.join(self.iter_html())
+
+    def iter_html(self) -> Iterator[str]:
+        """
+            Generate the node's HTML as a sequence of string chunks
+
+            Nested parents are walked with an explicit stack, so each chunk is produced once
+            no matter how deep the tree is, rather than being re-joined at every level.
+        """
+        yield self.open_tag()
+        stack = [(self, iter(self.children))]
+
+        while len(stack) > 0:
+            (node, children) = stack[-1]
+            child = next(children, None)
+
+            if child is None:
+                stack.pop()
+                yield f"</{node.tag}>"
+            elif isinstance(child, ParentNode):
+                yield child.open_tag()
+                stack.append((child, iter(child.children)))
+            else:
+                yield from child.iter_html()
\ No newline at end of file
@@ -0,0 +1,134 @@
+from pathlib import Path
+import os
+import struct
+import threading
+
+# JPEG start-of-frame markers, which carry the image dimensions
+JPEG_SOF_MARKERS = { 0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF }
+
+def _jpeg_size(f) -> tuple[int, int] | None:
+    # Walk the segments after the SOI marker, skipping each one's data, until a start-of-frame segment
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        # Fill bytes may precede a marker
+        while marker[1] == 0xFF:
+            marker = marker[1:] + f.read(1)
+            if len(marker) < 2:
+                return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        (length,) = struct.unpack(">H", length)
+        if marker[1] in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            (height, width) = struct.unpack(">HH", data[1:5])
+            return (width, height)
+        f.seek(length - 2, os.SEEK_CUR)
+
+def read_image_size(path: Path) -> tuple[int, int] | None:
+    """
+        Read the width and height of a PNG, JPEG, GIF or WebP image from its header bytes
+
+        Returns None for other formats or truncated files; the image data itself is never decoded.
+    """
+    with open(path, mode = "rb") as f:
+        header = f.read(30)
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP" and len(header) >= 30:
+            chunk = header[12:16]
+            if chunk == b"VP8 ":
+                (width, height) = struct.unpack("<HH", header[26:30])
+                return (width & 0x3FFF, height & 0x3FFF)
+            if chunk == b"VP8L":
+                bits = int.from_bytes(header[21:25], "little")
+                return ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+            if chunk == b"VP8X":
+                return (int.from_bytes(header[24:27], "little") + 1, int.from_bytes(header[27:30], "little") + 1)
+            return None
+        if header[:2] == b"\xff\xd8":
+            return _jpeg_size(f)
+    return None
+
+class ImageMarkup():
+    """
+        Adds `width`, `height`, `loading="lazy"` and `decoding="async"` to images rendered from markdown
+
+        Disabled by default. Dimensions are read from the header of the referenced file under `static/`,
+        and cached by path and mtime so each image is probed once no matter how often it is referenced.
+        Only site-absolute URLs such as `/images/logo.png` are looked up; other images just get the loading hints.
+    """
+    def __init__(self) -> None:
+        self.enabled = False
+        self.static_path = None
+        self.sizes = {}
+        # Blocks may render on dev server threads
+        self.lock = threading.Lock()
+
+    def configure(self, static_path: Path | None) -> None:
+        """
+            Enable the extra markup for images under `static_path`, or disable it with None
+        """
+        self.enabled = static_path is not None
+        self.static_path = None if static_path is None else Path(static_path)
+
+    def path(self, url: str) -> Path | None:
+        """
+            File under `static/` whose dimensions an image with source `url` is given, if it is site-absolute
+        """
+        if not url.startswith('/') or url.startswith("//"):
+            return None
+        return Path.joinpath(self.static_path, url.split('?', 1)[0].split('#', 1)[0].lstrip('/'))
+
+    def size(self, url: str) -> tuple[int, int] | None:
+        path = self.path(url)
+        if path is None:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        with self.lock:
+            cached = self.sizes.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            size = read_image_size(path)
+        except OSError:
+            size = None
+        with self.lock:
+            self.sizes[path] = (mtime, size)
+        return size
+
+    def attributes(self, url: str) -> dict:
+        """
+            Extra attributes for an image with source `url`
+        """
+        props = {}
+        size = self.size(url)
+        if size is not None:
+            props["width"] = str(size[0])
+            props["height"] = str(size[1])
+        props["loading"] = "lazy"
+        props["decoding"] = "async"
+        return props
+
+image_markup = ImageMarkup()
+
+def configure_image_markup(static_path: Path | None) -> None:
+    """
+        Module-level entry point to `image_markup.configure`, usable as a worker process initializer
+    """
+    image_markup.configure(static_path)
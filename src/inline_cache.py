@@ -0,0 +1,64 @@
+from collections import OrderedDict
+import threading
+
+from converters.text_node_converters import text_node_to_html_node
+from htmlnode import HTMLNode
+from image_size import image_markup
+from parsers import text_to_textnodes
+from profiler import profiler
+
+class InlineCache():
+    """
+        LRU cache mapping short inline markdown strings to their HTML nodes
+
+        Headings and list items repeat constantly across a site, so they are parsed once per process.
+        Strings longer than `max_length` are rendered without being stored, keeping the cache small,
+        as are images while `image_markup` is enabled, since their dimensions follow the image file.
+        Cached nodes are shared between trees and must not be mutated.
+    """
+    def __init__(self, capacity: int = 4096, max_length: int = 256) -> None:
+        self.capacity = capacity
+        self.max_length = max_length
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # The dev server renders pages on worker threads, which share the cache
+        self.lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def render(self, text: str) -> list[HTMLNode]:
+        """
+            Convert inline markdown `text` to a new list of HTML nodes
+        """
+        if len(text) > self.max_length or (image_markup.enabled and "![" in text):
+            return list(map(text_node_to_html_node, text_to_textnodes(text)))
+
+        with self.lock:
+            nodes = self.entries.get(text)
+            if nodes is not None:
+                self.entries.move_to_end(text)
+                self.hits += 1
+        if nodes is not None:
+            if profiler.enabled:
+                profiler.add("inline_cache.hits")
+            return list(nodes)
+
+        nodes = tuple(map(text_node_to_html_node, text_to_textnodes(text)))
+        with self.lock:
+            self.misses += 1
+            self.entries[text] = nodes
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        if profiler.enabled:
+            profiler.add("inline_cache.misses")
+        return list(nodes)
+
+inline_cache = InlineCache()
+
+def render_inline(text: str) -> list[HTMLNode]:
+    return inline_cache.render(text)
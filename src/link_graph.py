@@ -0,0 +1,149 @@
+from pathlib import Path
+import posixpath
+
+from assets import CSS_URL_EXPR, HTML_REF_EXPR, resolve_reference, walk_files
+from front_matter import split_front_matter
+from metadata_index import page_url
+from parsers import extract_markdown_images, extract_markdown_links
+
+class LinkCollector():
+    """
+        Collects the `href` and `src` references of a page's HTML while it is serialized
+
+        Tags are never split across serialized chunks, so each chunk is searched on its own.
+    """
+    def __init__(self) -> None:
+        self.references = set()
+
+    def feed(self, chunk: str) -> None:
+        for match in HTML_REF_EXPR.finditer(chunk):
+            self.references.add(match.group(2))
+
+def template_references(template_path: Path) -> set[str]:
+    """
+        Site paths the template references; they are resolved from the site root, since every page shares them
+    """
+    with open(template_path) as f:
+        targets = { resolve_reference(match.group(2), '/') for match in HTML_REF_EXPR.finditer(f.read()) }
+    targets.discard(None)
+    return targets
+
+def stylesheet_references(static_path: Path, stylesheet: str) -> set[str]:
+    """
+        Site paths referenced by `url()` in the stylesheet served at `stylesheet`
+    """
+    with open(Path.joinpath(static_path, stylesheet.lstrip('/'))) as f:
+        css = f.read()
+    base = posixpath.dirname(stylesheet)
+    targets = { resolve_reference(match.group(2), base) for match in CSS_URL_EXPR.finditer(css) }
+    targets.discard(None)
+    return targets
+
+def follow_stylesheets(referenced: set[str], assets: set[str], static_path: Path) -> set[str]:
+    """
+        Add everything reachable through `url()` references of the referenced stylesheets to `referenced`
+    """
+    pending = [ target for target in referenced if target in assets and target.endswith(".css") ]
+    while len(pending) > 0:
+        for target in stylesheet_references(static_path, pending.pop()):
+            if target not in referenced:
+                referenced.add(target)
+                if target in assets and target.endswith(".css"):
+                    pending.append(target)
+    return referenced
+
+def reachable_assets(content_path: Path, static_path: Path, template_path: Path) -> set[Path]:
+    """
+        Find the files in `static/` reachable from the pages, before any page is rendered
+
+        Roots are the template's references and the image and link URLs of every markdown file;
+        stylesheets among them pull in their own `url()` references.
+        Returns the absolute paths of the reachable files.
+    """
+    content_path = Path(content_path)
+    static_path = Path(static_path)
+    assets = { '/' + relative.as_posix(): relative for relative in walk_files(static_path) }
+
+    referenced = template_references(template_path)
+    for relative in walk_files(content_path):
+        base = posixpath.dirname(page_url(relative))
+        with open(Path.joinpath(content_path, relative)) as f:
+            (_, markdown) = split_front_matter(f.read())
+        for (_, url) in extract_markdown_images(markdown) + extract_markdown_links(markdown):
+            referenced.add(resolve_reference(url, base))
+    referenced.discard(None)
+
+    follow_stylesheets(referenced, set(assets), static_path)
+    return { Path.joinpath(static_path, assets[target]) for target in referenced if target in assets }
+
+class LinkReport():
+    def __init__(self, broken: dict[str, list[str]], orphans: list[str]) -> None:
+        self.broken = broken
+        self.orphans = orphans
+
+    def lines(self) -> list[str]:
+        lines = []
+        for (page, targets) in self.broken.items():
+            for target in targets:
+                lines.append(f"Broken link in `{page}`: `{target}`")
+        for asset in self.orphans:
+            lines.append(f"Orphaned asset `{asset}`")
+        return lines
+
+class LinkGraph():
+    """
+        Site-wide graph of the internal pages and assets each generated page references
+
+        Pages are added from their summaries as they are generated, then `check` compares every
+        target against the set of generated pages and the files in `static/`.
+    """
+    def __init__(self, public_path: Path, static_path: Path) -> None:
+        self.public_path = Path(public_path)
+        self.static_path = Path(static_path)
+        self.pages = {}
+        self.extra_references = set()
+
+    def site_path(self, dest_path: Path) -> str:
+        return '/' + Path(dest_path).relative_to(self.public_path).as_posix()
+
+    def add(self, dest_path: Path, summary: dict) -> None:
+        """
+            Add the page written to `dest_path`, described by a summary from `summarize_page`
+        """
+        page = self.site_path(dest_path)
+        base = posixpath.dirname(page)
+        targets = { resolve_reference(reference, base) for reference in summary["links"] }
+        targets.discard(None)
+        self.pages[page] = targets
+
+    def add_template(self, template_path: Path) -> None:
+        """
+            Count the assets the template references, which every page shares, as used
+        """
+        self.extra_references |= template_references(template_path)
+
+    def check(self, extra_outputs: set[str] = set()) -> LinkReport:
+        """
+            Find internal targets that match no generated page or static file, and static files nothing reaches
+
+            Stylesheets that are referenced count their `url()` targets as referenced too.
+            `extra_outputs` lists other files the build writes, such as the sitemap.
+        """
+        assets = { '/' + relative.as_posix() for relative in walk_files(self.static_path) } if self.static_path.exists() else set()
+        outputs = set(self.pages) | assets | extra_outputs
+
+        def exists(target: str) -> bool:
+            return target in outputs or f"{target.rstrip('/')}/index.html" in outputs
+
+        broken = {}
+        for (page, targets) in self.pages.items():
+            missing = sorted(target for target in targets if not exists(target))
+            if len(missing) > 0:
+                broken[page] = missing
+
+        referenced = set(self.extra_references)
+        for targets in self.pages.values():
+            referenced |= targets
+        follow_stylesheets(referenced, assets, self.static_path)
+
+        return LinkReport(broken, sorted(assets - referenced))
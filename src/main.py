@@ -1,66 +1,571 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
 from pathlib import Path
+import argparse
+import asyncio
 import os
 import shutil
+import sys
 
-from converters.html_converters import markdown_to_html_node
-from markdown_blocks import extract_title
+from assets import AssetPipeline, AssetReferences, walk_files
+from block_cache import BlockCache
+from compression import OutputCompressor, compressed_siblings
+from converters.html_converters import markdown_to_page, stream_blocks_to_html_node
+from front_matter import read_front_matter, split_front_matter, template_value
+from manifest import BuildManifest
+from markdown_blocks import classify_block, find_title, iter_blocks
+from parsers import extract_markdown_images
+from image_size import configure_image_markup, image_markup
+from link_graph import LinkCollector, LinkGraph, reachable_assets
+from metadata_index import MetadataIndex
+from output_writer import OutputWriter
+from page_fragments import FragmentStore
+from profiler import profiler
+from server import DevServer
+from site_outputs import SITE_OUTPUT_FILES, PageText, SiteOutputs, TextTap, page_date, summarize_page
+from static_sync import LINK_MODES, sync_directory_contents
+from templates import load_template
 
-def copy_directory_contents(src: str, dest: str) -> None:
+# Markdown files at least this many bytes are rendered block by block instead of read whole
+STREAMING_THRESHOLD = 8 * 1024 * 1024
+
+def clear_directory(path: str) -> None:
     """
-        Utility to copy a directory to another location, clearing the destination directory
+        Utility to delete everything inside a directory, keeping the directory itself
     """
-    # Clear destination
-    contents = os.listdir(dest)
+    contents = os.listdir(path)
     for item in contents:
-        file = Path(Path.joinpath(dest, item))
+        file = Path(Path.joinpath(path, item))
         if file.is_dir():
             shutil.rmtree(file)
         else:
             Path.unlink(file)
 
+def copy_directory_contents(src: str, dest: str, clear: bool = True, include: set[Path] | None = None) -> None:
+    """
+        Utility to copy a directory to another location, clearing the destination directory
+
+        With `clear` set to False the destination is left in place and files are copied over it.
+        With `include`, only those paths of `src` (files and the directories holding them) are copied.
+    """
+    # Clear destination
+    if clear:
+        clear_directory(dest)
 
     contents = os.listdir(src)
     for item in contents:
         file = Path(Path.joinpath(src, item))
+        if include is not None and file not in include:
+            continue
         if file.is_dir():
-            os.mkdir(Path.joinpath(dest, item))
-            copy_directory_contents(Path.joinpath(src, item), Path.joinpath(dest, item))
+            os.makedirs(Path.joinpath(dest, item), exist_ok=not clear)
+            copy_directory_contents(Path.joinpath(src, item), Path.joinpath(dest, item), clear, include)
         else:
+            if not clear:
+                # The destination may be hard linked to the source by an earlier sync, so replace it rather than write through it
+                Path.joinpath(dest, item).unlink(missing_ok=True)
             shutil.copy(file, Path.joinpath(dest, item))
 
-def generate_page(from_path: str, template_path: str, dest_path: str) -> None:
+def generate_page(from_path: str, template_path: str, dest_path: str, public_path: Path | None = None, block_cache: BlockCache | None = None, compressor: OutputCompressor | None = None, summarize: bool = False, writer: OutputWriter | None = None, fragments: FragmentStore | None = None, assets: AssetReferences | None = None) -> dict | None:
+    """
+        Render the markdown file at `from_path` into `template_path` and write it to `dest_path`
+
+        The template receives `Title`, `Content`, the page's `Date` and every field of its front matter.
+        Given the `public_path` the page is written under, it also receives the page's site `Path`, such as `/blog/post.html`.
+        With a `block_cache`, blocks rendered by earlier builds are reused.
+        With `fragments`, the page's previous build is diffed block by block and only new or edited blocks are rendered.
+        With a `compressor`, the page is queued for precompression once written.
+        With `summarize`, the page's title, date, summary, search terms and link targets are collected while it is written and returned.
+        With `assets`, references to static files are pointed at their hashed names as the page is written.
+        The page is written atomically through `writer`, and left untouched if its HTML is unchanged.
+    """
     print(f"Generate page from `{from_path}` using `{template_path}` to `{dest_path}`")
 
+    with profiler.page(from_path):
+        template = load_template(template_path)
+        cache = block_cache if fragments is None else fragments.page(from_path, block_cache)
+
+        source = None
+        try:
+            if os.path.getsize(from_path) < STREAMING_THRESHOLD:
+                with profiler.stage("file_io"):
+                    with open(from_path) as f:
+                        markdown = f.read()
+                (metadata, markdown) = split_front_matter(markdown)
+                (title, content) = markdown_to_page(markdown, cache)
+            else:
+                # Large files are read line by line twice, once for the title and once while writing,
+                # so only one block is held in memory at a time
+                with open(from_path) as f:
+                    (metadata, body) = read_front_matter(f)
+                    title = find_title(iter_blocks(body))
+                if title is None:
+                    raise ValueError("Markdown provided contains no H1-level heading")
+                source = open(from_path)
+                (_, body) = read_front_matter(source)
+                content = stream_blocks_to_html_node((classify_block(block) for block in iter_blocks(body)), cache)
+
+            values = { key: template_value(value) for (key, value) in metadata.items() }
+            if public_path is not None:
+                values["Path"] = '/' + Path(dest_path).relative_to(public_path).as_posix()
+            values["Date"] = page_date(metadata, from_path)
+            values["Title"] = title
+            values["Content"] = content
+            if summarize:
+                text = PageText()
+                links = LinkCollector()
+                values["Content"] = TextTap(content, text, links)
+
+            writer = OutputWriter() if writer is None else writer
+
+            # Stream the content straight into the file instead of materializing the whole page first
+            with writer.open(dest_path) as f:
+                template.write(f if assets is None else assets.wrap(f, dest_path), values)
+        finally:
+            if source is not None:
+                source.close()
+            if fragments is not None:
+                cache.close()
+
+    if compressor is not None:
+        compressor.submit(dest_path)
+
+    if profiler.enabled:
+        profiler.add("bytes_in", os.path.getsize(from_path))
+        profiler.add("bytes_out", os.path.getsize(dest_path))
+
+    if summarize:
+        return summarize_page(title, metadata, from_path, text, links.references)
+    return None
+
+def image_dependencies(from_path: Path) -> list[Path]:
+    """
+        With image dimensions enabled, list the files under `static/` the page at `from_path` reads dimensions from
+    """
+    if not image_markup.enabled:
+        return []
+    paths = set()
     with open(from_path) as f:
-        markdown = f.read()
-    
-    with open(template_path) as f:
-        template = f.read()
-    
-    title = extract_title(markdown)
-    content = markdown_to_html_node(markdown)
+        (_, body) = read_front_matter(f)
+        for block in iter_blocks(body):
+            for (_, url) in extract_markdown_images(block):
+                path = image_markup.path(url)
+                if path is not None:
+                    paths.add(path)
+    return sorted(paths)
+
+def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, manifest: BuildManifest | None = None, block_cache: BlockCache | None = None, compressor: OutputCompressor | None = None, collectors: list | None = None, writer: OutputWriter | None = None, fragments: FragmentStore | None = None, public_path: Path | None = None, assets: AssetReferences | None = None):
+    """
+        Generate a page for every markdown file under `dir_path_content`
 
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", content.to_html())
+        `public_path` is the root of the site, defaulting to `dest_dir_path`; nested calls pass it down.
 
-    output_file = Path(dest_path)
-    output_file.parent.mkdir(exist_ok=True, parents=True)
+        When a manifest is given, pages whose source and template are unchanged since the last build are skipped.
+        With `collectors`, such as `SiteOutputs` or a `LinkGraph`, every page's summary is added to each of them
+        in the same walk; skipped pages are added from the summary recorded in the manifest.
+    """
+    public_path = dest_dir_path if public_path is None else public_path
+    for item in os.listdir(dir_path_content):
+        file = Path(Path.joinpath(dir_path_content, item))
+        if file.is_dir():
+            generate_pages_recursive(Path.joinpath(dir_path_content, item), template_path, Path.joinpath(dest_dir_path, item), manifest, block_cache, compressor, collectors, writer, fragments, public_path, assets)
+            continue
+
+        dest_path = Path.joinpath(dest_dir_path, f"{file.stem}.html")
+        if manifest is not None and manifest.is_current(file, dest_path):
+            summary = manifest.summary(file)
+            if not collectors:
+                continue
+            if summary is not None:
+                for collector in collectors:
+                    collector.add(dest_path, summary)
+                continue
 
-    with open(dest_path, mode = "w") as f:
-        f.write(template)    
+        summary = generate_page(file, template_path, dest_path, public_path, block_cache=block_cache, compressor=compressor, summarize=bool(collectors), writer=writer, fragments=fragments, assets=assets)
+        for collector in (collectors or []):
+            collector.add(dest_path, summary)
+        if manifest is not None:
+            manifest.record(file, dest_path, summary, image_dependencies(file))
 
-def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str):
+def collect_page_jobs(dir_path_content: str, dest_dir_path: str) -> list[tuple[Path, Path]]:
+    """
+        Walk `dir_path_content` and list every `(from_path, dest_path)` pair that needs a page generated
+    """
+    jobs = []
     for item in os.listdir(dir_path_content):
         file = Path(Path.joinpath(dir_path_content, item))
         if file.is_dir():
-            generate_pages_recursive(Path.joinpath(dir_path_content, item), template_path, Path.joinpath(dest_dir_path, item))
+            jobs.extend(collect_page_jobs(file, Path.joinpath(dest_dir_path, item)))
         else:
-            generate_page(file, template_path, Path.joinpath(dest_dir_path, f"{file.stem}.html"))
+            jobs.append((file, Path.joinpath(dest_dir_path, f"{file.stem}.html")))
+    return jobs
+
+# Block cache of a page generation worker process, set once by `init_worker` rather than sent with every page
+_worker_block_cache = None
+
+def init_worker(static_path: Path | None, block_cache: BlockCache | None) -> None:
+    """
+        Set up a page generation worker process with the image markup setting and the block cache
+
+        The cache keeps one database connection for every page the worker renders, closed when the worker exits.
+    """
+    global _worker_block_cache
+    configure_image_markup(static_path)
+    _worker_block_cache = block_cache
+    if block_cache is not None:
+        Finalize(block_cache, block_cache.close, exitpriority=10)
+
+def generate_worker_page(from_path: Path, template_path: str, dest_path: Path, public_path: Path | None, compressor: OutputCompressor | None, summarize: bool, writer: OutputWriter, fragments: FragmentStore | None, assets: AssetReferences | None) -> dict | None:
+    return generate_page(from_path, template_path, dest_path, public_path, _worker_block_cache, compressor, summarize, writer, fragments, assets)
+
+def generate_pages_parallel(jobs: list[tuple[Path, Path]], template_path: str, workers: int | None = None, block_cache: BlockCache | None = None, compressor: OutputCompressor | None = None, summaries: dict[Path, dict] | None = None, writer: OutputWriter | None = None, fragments: FragmentStore | None = None, public_path: Path | None = None, assets: AssetReferences | None = None) -> dict[Path, Exception]:
+    """
+        Generate the pages for `jobs` on a pool of `workers` processes
+
+        Output is identical to the serial build since every page still goes through `generate_page`.
+        Returns the errors raised while generating each failed page, keyed by source path.
+        With a `summaries` dictionary, the summary of each generated page is stored in it, keyed by source path.
+        Output directories are all created up front, so workers never race to make them.
+        Pages receive their site `Path` when the `public_path` the jobs write under is given.
+    """
+    writer = OutputWriter() if writer is None else writer
+    writer.make_dirs(dest_path.parent for (_, dest_path) in jobs)
+
+    errors = {}
+    # Workers inherit the image markup setting, whichever way the processes are started
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(image_markup.static_path, block_cache)) as executor:
+        futures = { from_path: executor.submit(generate_worker_page, from_path, template_path, dest_path, public_path, compressor, summaries is not None, writer, fragments, assets) for (from_path, dest_path) in jobs }
+        for from_path, future in futures.items():
+            error = future.exception()
+            if error is not None:
+                errors[from_path] = error
+            elif summaries is not None:
+                summaries[from_path] = future.result()
+    return errors
+
+# Options acting on the whole site at once, which watch mode's page by page rebuilds cannot honour
+WATCH_UNSUPPORTED = ["--asset-pipeline", "--precompress-assets", "--precompress", "--site-url", "--check-links", "--prune-assets", "--metadata-index", "--incremental", "--profile-json"]
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate the static site from `content/` and `static/` into `public/`")
+    parser.add_argument("--incremental", action="store_true", help="only rebuild pages whose source or template changed since the last build")
+    parser.add_argument("--sync", action="store_true", help="only copy new or changed static files instead of clearing `public/` first")
+    parser.add_argument("--sync-checksum", action="store_true", help="compare static files by content hash rather than modification time when syncing")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="copy", help="how synced static files are placed in `public/`")
+    parser.add_argument("--asset-pipeline", action="store_true", help="copy static files on a thread pool, renaming them by content hash and rewriting references to them")
+    parser.add_argument("--no-hash-assets", action="store_true", help="keep original file names in the asset pipeline")
+    parser.add_argument("--precompress-assets", action="store_true", help="write .gz (and .br, if brotli is installed) siblings of text assets in the asset pipeline")
+    parser.add_argument("--precompress", action="store_true", help="write gzip (and brotli/zstd, if installed) siblings of generated pages and static text files")
+    parser.add_argument("--precompress-min-size", type=int, default=1024, help="skip precompressing files smaller than this many bytes")
+    parser.add_argument("--site-url", help="absolute URL the site is served from; also writes sitemap.xml, an Atom feed.xml and search-index.json")
+    parser.add_argument("--feed-size", type=int, default=20, help="number of newest pages listed in the feed")
+    parser.add_argument("--metadata-index", nargs="?", const=".cache/metadata-index.json", help="also write an index of every page's URL, title and front matter to this file, relative to the project, reading only the headers of changed files (default: .cache/metadata-index.json)")
+    parser.add_argument("--check-links", action="store_true", help="report internal links to missing pages or files, and static files no page references")
+    parser.add_argument("--prune-assets", action="store_true", help="only copy static files that pages, the template or referenced stylesheets point at, listing the ones skipped")
+    parser.add_argument("--image-dimensions", action="store_true", help="give images width and height read from the files in `static/`, plus lazy loading and async decoding")
+    parser.add_argument("--watch", action="store_true", help="after building, keep rebuilding only what changed whenever inputs are modified")
+    parser.add_argument("--watch-interval", type=float, default=0.1, help="seconds between polls for changes in watch mode")
+    parser.add_argument("--serve", action="store_true", help="run the preview server, rendering pages on demand instead of building `public/`")
+    parser.add_argument("--port", type=int, default=8888, help="port for the preview server")
+    parser.add_argument("--profile", action="store_true", default=bool(os.environ.get("SSG_PROFILE")), help="time each build stage and report the slowest pages (also enabled by setting SSG_PROFILE)")
+    parser.add_argument("--profile-json", help="also write the profile as JSON to this file")
+    parser.add_argument("--block-cache", nargs="?", const=".cache/blocks", help="reuse rendered block HTML from a cache in this directory, relative to the project (default: .cache/blocks)")
+    parser.add_argument("--block-cache-size", type=int, default=256, help="maximum size of the block cache in megabytes")
+    parser.add_argument("--partial-rebuild", nargs="?", const=".cache/pages", help="keep each page's rendered blocks in this directory, relative to the project, and re-render only blocks that changed since the last build (default: .cache/pages)")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes used to render pages (0 uses every CPU core)")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        unsupported = [ option for option in WATCH_UNSUPPORTED if getattr(args, option.removeprefix("--").replace('-', '_')) not in (None, False) ]
+        # Rebuilds render one page at a time in this process
+        if args.workers != 1:
+            unsupported.append("--workers")
+        if len(unsupported) > 0:
+            parser.error(f"--watch cannot be combined with {', '.join(unsupported)}")
+    return args
+
+def select_static_files(project_path: Path, template_path: Path, args: argparse.Namespace) -> set[Path] | None:
+    """
+        With `--prune-assets`, find the static files reachable from the content and report the rest as skipped
+
+        Returns the reachable files along with the directories holding them, or None to copy everything.
+    """
+    if not args.prune_assets:
+        return None
+
+    static_path = Path.joinpath(project_path, 'static/')
+    with profiler.stage("asset_pruning"):
+        reachable = reachable_assets(Path.joinpath(project_path, 'content/'), static_path, template_path)
+        skipped = sorted(relative for relative in walk_files(static_path) if Path.joinpath(static_path, relative) not in reachable)
+    for relative in skipped:
+        print(f"Skipped unreferenced static file `{relative}`")
+    print(f"Pruned static files: {len(reachable)} copied, {len(skipped)} skipped")
+
+    include = set(reachable)
+    for path in reachable:
+        include.update(parent for parent in path.parents if parent != static_path and static_path in parent.parents)
+    return include
+
+def copy_static(project_path: Path, public_path: Path, args: argparse.Namespace, compressor: OutputCompressor | None = None, template_path: Path | None = None) -> AssetPipeline | None:
+    """
+        Copy `static/` into `public/`, either by clearing and copying, by syncing only what changed,
+        or through the asset pipeline, which is returned so generated pages can be rewritten afterwards
+
+        With a `compressor`, copied files are queued for precompression.
+        With `--prune-assets`, only files reachable from the content and `template_path` are copied.
+    """
+    static_path = Path.joinpath(project_path, 'static/')
+    include = select_static_files(project_path, Path.joinpath(project_path, 'template.html') if template_path is None else template_path, args)
+    if args.asset_pipeline:
+        formats = None if compressor is None else compressor.formats
+        pipeline = AssetPipeline(static_path, public_path, hash_names=not args.no_hash_assets, compress=args.precompress_assets or args.precompress, include=include, formats=formats, min_size=args.precompress_min_size)
+        with profiler.stage("asset_copying"):
+            pipeline.run()
+            # Outputs are replaced in place, so unchanged files keep their mtime. A full build then removes whatever
+            # it did not write, as clearing would; an incremental one keeps its pages and drops older hashed assets,
+            # since skipped pages are repointed at the current names by `rewrite_asset_references`
+            keep = { dest_path for (_, dest_path) in collect_page_jobs(Path.joinpath(project_path, 'content/'), public_path) }
+            if args.site_url is not None:
+                keep |= { Path.joinpath(public_path, name) for name in SITE_OUTPUT_FILES }
+            removed = pipeline.prune(keep, hashed_only=args.incremental)
+        if len(removed) > 0:
+            print(f"Removed {len(removed)} stale outputs")
+        return pipeline
+
+    if not args.sync:
+        # Generated pages must survive between incremental builds, so static files are copied over the existing output
+        with profiler.stage("asset_copying"):
+            copy_directory_contents(static_path, public_path, clear=not args.incremental, include=include)
+        if compressor is not None:
+            for relative in walk_files(static_path):
+                if include is None or Path.joinpath(static_path, relative) in include:
+                    compressor.submit(Path.joinpath(public_path, relative))
+        return None
+
+    keep = { dest_path for (_, dest_path) in collect_page_jobs(Path.joinpath(project_path, 'content/'), public_path) }
+    if args.site_url is not None:
+        keep |= { Path.joinpath(public_path, name) for name in SITE_OUTPUT_FILES }
+    if compressor is not None:
+        # Precompressed siblings have no source in `static/`, so keep those of pages and of unchanged files
+        outputs = keep | { Path.joinpath(public_path, relative) for relative in walk_files(static_path) }
+        keep |= { sibling for output in outputs for sibling in compressed_siblings(output, compressor.formats) }
+    with profiler.stage("asset_copying"):
+        report = sync_directory_contents(static_path, public_path, checksum=args.sync_checksum, link_mode=args.link_mode, keep=keep, include=include)
+    if compressor is not None:
+        for output in report.copied:
+            compressor.submit(output)
+    print(f"Synced static files: {len(report.copied)} copied, {len(report.unchanged)} unchanged, {len(report.removed)} removed")
+    return None
+
+def rewrite_asset_references(project_path: Path, public_path: Path, pipeline: AssetPipeline | None, compressor: OutputCompressor | None) -> None:
+    """
+        Point pages at the current hashed asset names where writing them did not, such as pages an incremental build skipped
+    """
+    if pipeline is None:
+        return
+    pages = [ dest_path for (_, dest_path) in collect_page_jobs(Path.joinpath(project_path, 'content/'), public_path) ]
+    if compressor is not None:
+        # Pages queued when written must be compressed before a rewrite queues them again
+        compressor.wait()
+    with profiler.stage("asset_copying"):
+        rewritten = pipeline.rewrite_html(pages)
+    if compressor is not None:
+        for page in rewritten:
+            compressor.submit(page)
+
+def asset_references(pipeline: AssetPipeline | None) -> AssetReferences | None:
+    return None if pipeline is None else pipeline.references()
+
+def open_compressor(args: argparse.Namespace) -> OutputCompressor | None:
+    if not args.precompress:
+        return None
+    return OutputCompressor(min_size=args.precompress_min_size)
+
+def open_block_cache(project_path: Path, args: argparse.Namespace) -> BlockCache | None:
+    if args.block_cache is None:
+        return None
+    return BlockCache(Path.joinpath(project_path, args.block_cache), args.block_cache_size * 1024 * 1024)
+
+def index_metadata(project_path: Path, args: argparse.Namespace) -> MetadataIndex | None:
+    """
+        With `--metadata-index`, update the persisted site-wide metadata index from the headers of every content file
+
+        Files whose header cannot be read are recorded in the index; their pages report the error when generated.
+    """
+    if args.metadata_index is None:
+        return None
+    with profiler.stage("metadata_indexing"):
+        index = MetadataIndex(Path.joinpath(project_path, args.metadata_index))
+        index.scan(Path.joinpath(project_path, 'content/'))
+        index.save()
+    if profiler.enabled:
+        profiler.add("metadata_index.scanned", index.scanned)
+        profiler.add("metadata_index.reused", index.reused)
+    return index
+
+def open_site_outputs(public_path: Path, args: argparse.Namespace, writer: OutputWriter) -> SiteOutputs | None:
+    if args.site_url is None:
+        return None
+    return SiteOutputs(public_path, args.site_url, feed_size=args.feed_size, writer=writer)
+
+def close_site_outputs(outputs: SiteOutputs | None, compressor: OutputCompressor | None) -> None:
+    if outputs is None:
+        return
+    with profiler.stage("site_outputs"):
+        written = outputs.close()
+    if compressor is not None:
+        for output in written:
+            compressor.submit(output)
+
+def open_link_graph(project_path: Path, template_path: Path, public_path: Path, args: argparse.Namespace) -> LinkGraph | None:
+    if not args.check_links:
+        return None
+    graph = LinkGraph(public_path, Path.joinpath(project_path, 'static/'))
+    graph.add_template(template_path)
+    return graph
+
+def report_links(graph: LinkGraph | None, args: argparse.Namespace) -> None:
+    if graph is None:
+        return
+    extra_outputs = set() if args.site_url is None else { '/' + name for name in SITE_OUTPUT_FILES }
+    with profiler.stage("link_checking"):
+        report = graph.check(extra_outputs)
+    for line in report.lines():
+        print(line)
+    print(f"Link check: {sum(len(targets) for targets in report.broken.values())} broken links, {len(report.orphans)} orphaned assets")
+
+def open_fragment_store(project_path: Path, args: argparse.Namespace) -> FragmentStore | None:
+    if args.partial_rebuild is None:
+        return None
+    return FragmentStore(Path.joinpath(project_path, args.partial_rebuild))
+
+def open_manifest(project_path: Path, template_path: Path, args: argparse.Namespace) -> BuildManifest | None:
+    if not args.incremental:
+        return None
+    # Options that change how pages render, so toggling one rebuilds every page
+    settings = { "image_dimensions": args.image_dimensions }
+    return BuildManifest(Path.joinpath(project_path, '.build-manifest.json'), template_path, settings)
+
+def build_serial(project_path: Path, template_path: Path, public_path: Path, args: argparse.Namespace) -> None:
+    compressor = open_compressor(args)
+    pipeline = copy_static(project_path, public_path, args, compressor, template_path)
+    block_cache = open_block_cache(project_path, args)
+    index_metadata(project_path, args)
+    writer = OutputWriter()
+    outputs = open_site_outputs(public_path, args, writer)
+    graph = open_link_graph(project_path, template_path, public_path, args)
+    collectors = [ collector for collector in (outputs, graph) if collector is not None ]
+
+    manifest = open_manifest(project_path, template_path, args)
+    generate_pages_recursive(Path.joinpath(project_path, 'content/'), template_path, public_path, manifest, block_cache, compressor, collectors, writer, open_fragment_store(project_path, args), public_path, asset_references(pipeline))
+    close_site_outputs(outputs, compressor)
+    report_links(graph, args)
+    if block_cache is not None:
+        block_cache.close()
+
+    if manifest is not None:
+        for output in manifest.remove_stale():
+            for sibling in compressed_siblings(Path(output)):
+                sibling.unlink(missing_ok=True)
+            print(f"Removed stale page `{output}`")
+        manifest.save()
+
+    rewrite_asset_references(project_path, public_path, pipeline, compressor)
+    if compressor is not None:
+        compressor.close()
+
+def build_parallel(project_path: Path, template_path: Path, public_path: Path, args: argparse.Namespace) -> None:
+    compressor = open_compressor(args)
+    pipeline = copy_static(project_path, public_path, args, compressor, template_path)
+    index_metadata(project_path, args)
+    writer = OutputWriter()
+    outputs = open_site_outputs(public_path, args, writer)
+    graph = open_link_graph(project_path, template_path, public_path, args)
+    collectors = [ collector for collector in (outputs, graph) if collector is not None ]
+    summaries = None if len(collectors) == 0 else {}
+
+    all_jobs = collect_page_jobs(Path.joinpath(project_path, 'content/'), public_path)
+    jobs = all_jobs
+    manifest = open_manifest(project_path, template_path, args)
+    if manifest is not None:
+        jobs = [ (from_path, dest_path) for (from_path, dest_path) in jobs if not manifest.is_current(from_path, dest_path) or (summaries is not None and manifest.summary(from_path) is None) ]
+
+    errors = generate_pages_parallel(jobs, template_path, args.workers or None, open_block_cache(project_path, args), compressor, summaries, writer, open_fragment_store(project_path, args), public_path, asset_references(pipeline))
+    for from_path, error in errors.items():
+        print(f"Failed to generate page from `{from_path}`: {error}", file=sys.stderr)
+
+    if summaries is not None:
+        # Pages are added in walk order, so the outputs match the serial build
+        for (from_path, dest_path) in all_jobs:
+            summary = summaries.get(from_path) if from_path in summaries else (None if manifest is None else manifest.summary(from_path))
+            if summary is not None:
+                for collector in collectors:
+                    collector.add(dest_path, summary)
+        close_site_outputs(outputs, compressor)
+        report_links(graph, args)
+
+    if manifest is not None:
+        for (from_path, dest_path) in jobs:
+            if from_path not in errors:
+                manifest.record(from_path, dest_path, None if summaries is None else summaries[from_path], image_dependencies(from_path))
+        for output in manifest.remove_stale():
+            for sibling in compressed_siblings(Path(output)):
+                sibling.unlink(missing_ok=True)
+            print(f"Removed stale page `{output}`")
+        manifest.save()
+
+    rewrite_asset_references(project_path, public_path, pipeline, compressor)
+    if compressor is not None:
+        compressor.close()
+
+    if errors:
+        sys.exit(f"{len(errors)} of {len(jobs)} pages failed to generate")
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
 
-def main():
     project_path = Path(__file__).parent.parent
-    copy_directory_contents(Path.joinpath(project_path, 'static/'), Path.joinpath(project_path, 'public/'))
-    generate_pages_recursive(Path.joinpath(project_path, 'content/'), Path.joinpath(project_path, 'template.html'), Path.joinpath(project_path, 'public/'))
+    template_path = Path.joinpath(project_path, 'template.html')
+    public_path = Path.joinpath(project_path, 'public/')
+
+    if args.image_dimensions:
+        image_markup.configure(Path.joinpath(project_path, 'static/'))
+
+    if args.serve:
+        server = DevServer(Path.joinpath(project_path, 'content/'), Path.joinpath(project_path, 'static/'), template_path)
+        try:
+            asyncio.run(server.serve(port=args.port))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    public_path.mkdir(exist_ok=True)
+
+    if args.profile:
+        if args.workers != 1:
+            print("Profiling only covers work done in the main process; use --workers 1 for a full breakdown", file=sys.stderr)
+        profiler.enabled = True
+
+    if args.watch:
+        # Imported here since the watcher itself builds pages through this module
+        from watch import SiteWatcher
+        # Static files are always synced in watch mode, so `--sync` needs no handling of its own
+        block_cache = open_block_cache(project_path, args)
+        watcher = SiteWatcher(Path.joinpath(project_path, 'content/'), Path.joinpath(project_path, 'static/'), template_path, public_path, block_cache, open_fragment_store(project_path, args), args.link_mode, args.sync_checksum)
+        watcher.run(args.watch_interval)
+        if block_cache is not None:
+            block_cache.close()
+        return
+
+    if args.workers == 1:
+        build_serial(project_path, template_path, public_path, args)
+    else:
+        build_parallel(project_path, template_path, public_path, args)
+
+    if args.profile:
+        print(profiler.report())
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
 
 if __name__ == "__main__":
     main()
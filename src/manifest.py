@@ -0,0 +1,128 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 3
+
+def hash_file(path: str) -> str:
+    """
+        Compute the sha256 hex digest of a file's contents
+    """
+    digest = hashlib.sha256()
+    with open(path, mode = "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_mtime(path: str) -> int | None:
+    """
+        Modification time of `path` in nanoseconds, or None if it does not exist
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+class BuildManifest():
+    """
+        Record of the inputs each generated page was built from, used to skip unchanged pages.
+
+        Each entry maps a source path to its content hash, the template hash, the build `settings` that
+        change how pages render, the output path, and the mtimes of other files the page was rendered from.
+        A change to the template or the settings invalidates every entry.
+    """
+    def __init__(self, manifest_path: str, template_path: str, settings: dict | None = None) -> None:
+        self.manifest_path = Path(manifest_path)
+        self.template_hash = hash_file(template_path)
+        self.settings = {} if settings is None else settings
+        self.entries = {}
+        self.seen = set()
+        self._source_hashes = {}
+
+        if self.manifest_path.exists():
+            self.entries = self._read_entries()
+
+    def _read_entries(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("pages", {})
+
+    def is_current(self, source_path: str, dest_path: str) -> bool:
+        """
+            Check whether the output for `source_path` is up to date with its recorded inputs
+        """
+        key = str(source_path)
+        self.seen.add(key)
+
+        source_hash = hash_file(source_path)
+        self._source_hashes[key] = source_hash
+
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+
+        return entry["hash"] == source_hash \
+            and entry["template_hash"] == self.template_hash \
+            and entry["settings"] == self.settings \
+            and entry["output"] == str(dest_path) \
+            and Path(dest_path).exists() \
+            and all(file_mtime(path) == mtime for (path, mtime) in entry["dependencies"].items())
+
+    def summary(self, source_path: str) -> dict | None:
+        """
+            Page summary stored with the entry for `source_path`, if any
+        """
+        return self.entries.get(str(source_path), {}).get("summary")
+
+    def record(self, source_path: str, dest_path: str, summary: dict | None = None, dependencies: list[Path] | None = None) -> None:
+        """
+            Store the inputs `dest_path` was generated from, and optionally its page summary
+
+            `dependencies` are other files the page was rendered from, such as the images it gives dimensions;
+            a change to the mtime of any of them, or one appearing or disappearing, invalidates the entry.
+        """
+        key = str(source_path)
+        self.seen.add(key)
+
+        source_hash = self._source_hashes.pop(key, None)
+        if source_hash is None:
+            source_hash = hash_file(source_path)
+
+        self.entries[key] = {
+            "hash": source_hash,
+            "template_hash": self.template_hash,
+            "settings": self.settings,
+            "output": str(dest_path),
+            "dependencies": { str(path): file_mtime(path) for path in (dependencies or []) },
+        }
+        if summary is not None:
+            self.entries[key]["summary"] = summary
+
+    def remove_stale(self) -> list[str]:
+        """
+            Delete outputs whose source was not seen during this build, returning the removed output paths
+        """
+        removed = []
+        for key in list(self.entries):
+            if key in self.seen:
+                continue
+            output = self.entries.pop(key)["output"]
+            if os.path.exists(output):
+                os.unlink(output)
+            removed.append(output)
+        return removed
+
+    def save(self) -> None:
+        """
+            Write the manifest to disk
+        """
+        self.manifest_path.parent.mkdir(exist_ok=True, parents=True)
+        with open(self.manifest_path, mode = "w") as f:
+            json.dump({ "version": MANIFEST_VERSION, "pages": self.entries }, f, indent=1, sort_keys=True)
@@ -1,7 +1,10 @@
 from enum import Enum
+from typing import Iterable, Iterator, Self
 from htmlnode import ParentNode, LeafNode
 from converters.text_node_converters import text_node_to_html_node
+from inline_cache import render_inline
 from parsers import text_to_textnodes
+from profiler import profiled
 import re
 
 BlockType = Enum("BlockType", ["PARAGRAPH", "HEADING", "CODE", "QUOTE", "UNORDERED_LIST", "ORDERED_LIST"])
@@ -11,12 +14,11 @@ def block_to_paragraph(block: str) -> ParentNode:
     children = list(map(text_node_to_html_node, text_nodes))
     return ParentNode('p', children)
 
-def block_to_heading(block: str) -> ParentNode:
-    level = len(block.split(' ')[0]) # Get heading level by number of '#' at start
-    remainder = block.lstrip('#').lstrip()
-    text_nodes = text_to_textnodes(remainder)
-    children = list(map(text_node_to_html_node, text_nodes))
-    return ParentNode(f"h{level}", children)
+def block_to_heading(block: str, level: int | None = None) -> ParentNode:
+    if level is None:
+        level = len(block.split(' ')[0]) # Get heading level by number of '#' at start
+    remainder = block[level:].lstrip()
+    return ParentNode(f"h{level}", render_inline(remainder))
 
 def block_to_code(block: str) -> ParentNode:
     remainder = block.lstrip('```').rstrip('```').strip()
@@ -28,53 +30,152 @@ def block_to_quote(block: str) -> ParentNode:
     children = list(map(text_node_to_html_node, text_nodes))
     return ParentNode('blockquote', children)
 
-def block_to_unordered_list(block: str) -> ParentNode:
-    lines = [ line.lstrip('* ') for line in block.splitlines()]
-    text_node_lines = [text_to_textnodes(line) for line in lines]
-    children = []
-    for node_line in text_node_lines:
-        children.append(ParentNode('li', [text_node_to_html_node(node) for node in node_line ]))
+def block_to_unordered_list(block: str, items: list[str] | None = None) -> ParentNode:
+    lines = [ line.lstrip('* ') for line in block.splitlines()] if items is None else items
+    children = [ ParentNode('li', render_inline(line)) for line in lines ]
     return ParentNode('ul', children)
 
-def block_to_ordered_list(block: str) -> ParentNode:
-    lines = [ re.split("\d+. ", line, maxsplit=1)[1] for line in block.splitlines() ]
-    text_node_lines = [text_to_textnodes(line) for line in lines]
-    children = []
-    for node_line in text_node_lines:
-        children.append(ParentNode('li', [text_node_to_html_node(node) for node in node_line]))
+def block_to_ordered_list(block: str, items: list[str] | None = None) -> ParentNode:
+    lines = [ re.split("\d+. ", line, maxsplit=1)[1] for line in block.splitlines() ] if items is None else items
+    children = [ ParentNode('li', render_inline(line)) for line in lines ]
     return ParentNode('ol', children)
 
+def iter_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """
+        Lazily group lines of markdown into blocks, denoted by empty lines
+
+        Lines may keep their trailing newline, so an open file can be passed directly.
+        Empty lines inside a fenced code block do not end the block.
+    """
+    block = []
+    in_fence = False
+
+    for line in lines:
+        line = line.rstrip('\n')
+
+        if line.startswith("```"):
+            # A fence line that also closes on the same line does not open a block
+            if in_fence or "```" not in line[3:]:
+                in_fence = not in_fence
+        elif in_fence and line.rstrip().endswith("```"):
+            in_fence = False
+
+        if line == "" and not in_fence:
+            text = '\n'.join(block).strip()
+            if text:
+                yield text
+            block = []
+        else:
+            block.append(line)
+
+    text = '\n'.join(block).strip()
+    if text:
+        yield text
+
+@profiled("block_splitting")
 def markdown_to_blocks(markdown: str) -> list[str]:
     """
         Parse a markdown file into individual markdown blocks, denoted by empty lines
     """
-    blocks = markdown.split('\n\n')
-    blocks = [ x.strip() for x in blocks]
-    return blocks
+    return list(iter_blocks(markdown.split('\n')))
+
+# Expression to capture the marker of a heading block
+# Group 1: The `#` characters, one per heading level
+HEADING_EXPR = re.compile(r"(#{1,6}) \w")
+# Expression to match the marker of an ordered list item, which ends where the item text starts
+ORDERED_ITEM_EXPR = re.compile(r"\d+\. ")
+
+class Block():
+    """
+        A markdown block with its type and the metadata found while classifying it
+
+        `level` is the heading level for headings and `None` otherwise.
+        `items` is the text of each list item after its marker for lists and `None` otherwise.
+    """
+    __slots__ = ("text", "block_type", "level", "items")
+
+    def __init__(self, text: str, block_type: BlockType, level: int | None = None, items: list[str] | None = None) -> None:
+        self.text = text
+        self.block_type = block_type
+        self.level = level
+        self.items = items
+
+    def __eq__(self, other: Self) -> bool:
+        return self.text == other.text and self.block_type == other.block_type and self.level == other.level and self.items == other.items
+
+    def __repr__(self) -> str:
+        return f"Block({self.text!r}, {self.block_type.name}, {self.level}, {self.items})"
+
+@profiled("block_classification")
+def classify_block(block: str) -> Block:
+    """
+        Classify a block by looking at its start and then walking its lines once
+
+        Quote and list blocks need every line to carry the marker, so the three line checks
+        are tracked together and the walk stops as soon as none of them can still hold.
+        List items are collected during the same walk, so the renderer does not strip the markers again.
+    """
+    heading = HEADING_EXPR.match(block)
+    if heading:
+        return Block(block, BlockType.HEADING, len(heading.group(1)))
+
+    if block.startswith("```"):
+        # The first backtick after the opening fence must start a closing fence ending its line
+        close = block.find('`', 3)
+        if close != -1 and block.startswith("```", close) and (close + 3 == len(block) or block[close + 3] == '\n'):
+            return Block(block, BlockType.CODE)
+
+    # An empty block has no lines, so it satisfies every line check and is a quote
+    quote = unordered = ordered = True
+    items = []
+    for line in block.splitlines():
+        quote = quote and line.startswith('>')
+        unordered = unordered and line.startswith('* ')
+        marker = ORDERED_ITEM_EXPR.match(line) if ordered else None
+        ordered = marker is not None
+        if not (quote or unordered or ordered):
+            return Block(block, BlockType.PARAGRAPH)
+        if unordered:
+            items.append(line.lstrip('* '))
+        elif ordered:
+            items.append(line[marker.end():])
+
+    if quote:
+        return Block(block, BlockType.QUOTE)
+    if unordered:
+        return Block(block, BlockType.UNORDERED_LIST, items=items)
+    return Block(block, BlockType.ORDERED_LIST, items=items)
 
 def block_to_block_type(block: str) -> BlockType:
+    return classify_block(block).block_type
 
-    if re.match("^#{1,6} \w+", block):
-        return BlockType.HEADING
-    if re.match("^```[^`]*```$", block, re.MULTILINE):
-        return BlockType.CODE
-    if len(re.findall("^>.*", block, re.MULTILINE)) == len(block.splitlines()):
-        return BlockType.QUOTE
-    if len(re.findall("^\* .*", block, re.MULTILINE)) == len(block.splitlines()):
-        return BlockType.UNORDERED_LIST
-    if len(re.findall("^\d+\. .*", block, re.MULTILINE)) == len(block.splitlines()):
-        return BlockType.ORDERED_LIST
+def scan_blocks(markdown: str) -> tuple[list[Block], str | None]:
+    """
+        Split and classify a whole markdown document, returning its blocks and its title
 
-    return BlockType.PARAGRAPH
+        The title is the text of the first H1-level heading, or `None` if there is none.
+    """
+    blocks = []
+    title = None
+    for text in markdown_to_blocks(markdown):
+        block = classify_block(text)
+        if title is None and block.level == 1:
+            title = text.lstrip('#').strip()
+        blocks.append(block)
+    return (blocks, title)
+
+def find_title(blocks: Iterable[str]) -> str | None:
+    """
+        Find the text of the first H1-level heading among `blocks` without classifying the rest
+    """
+    for block in blocks:
+        heading = HEADING_EXPR.match(block)
+        if heading and len(heading.group(1)) == 1:
+            return block.lstrip('#').strip()
+    return None
 
 def extract_title(markdown: str) -> str:
-    headings = filter(lambda b: block_to_block_type(b) == BlockType.HEADING, markdown_to_blocks(markdown))
-    # heading_nodes = [block_to_heading(block) for block in headings]
-    # for node in heading_nodes:
-    #     if node.tag == 'h1':
-    #         return node.children
-    for heading in headings:
-        if re.match("^#{1} ", heading):
-            return heading.lstrip('#').strip()
-        
-    raise ValueError("Markdown provided contains no H1-level heading")
+    (_, title) = scan_blocks(markdown)
+    if title is None:
+        raise ValueError("Markdown provided contains no H1-level heading")
+    return title
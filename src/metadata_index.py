@@ -0,0 +1,135 @@
+from itertools import takewhile
+from pathlib import Path
+import json
+import os
+
+from front_matter import read_front_matter
+from markdown_blocks import HEADING_EXPR, find_title, iter_blocks
+
+METADATA_INDEX_VERSION = 1
+
+def read_page_header(path: Path) -> tuple[dict, str | None]:
+    """
+        Read the front matter and title of the markdown file at `path` without parsing its body
+
+        The title is the first H1-level heading among the heading blocks leading the body, so reading stops
+        at the first other block. Pages whose H1 comes later get no title here, unless their front matter sets one.
+    """
+    with open(path) as f:
+        (metadata, body) = read_front_matter(f)
+        title = find_title(takewhile(HEADING_EXPR.match, iter_blocks(body)))
+    return (metadata, title)
+
+def page_url(relative: Path) -> str:
+    """
+        Site path of the page generated from the markdown file at `relative`, such as `/blog/post.html`
+    """
+    return '/' + relative.with_suffix(".html").as_posix()
+
+class MetadataIndex():
+    """
+        Site-wide index of page metadata, built by scanning only the headers of content files
+
+        The index is a standalone artifact for external tooling; the build's own sitemap, feed and
+        search index are still collected from the pages as they are generated.
+
+        Each entry maps a source path, relative to the content directory, to its site URL, title and front matter.
+        Entries are persisted between builds and reused while the file's size and mtime are unchanged,
+        so listing pages, feeds and sitemaps can be generated without reading the content again.
+        A file whose header cannot be read gets an entry with its `error` instead, and is left out of `pages`.
+    """
+    def __init__(self, index_path: str | None = None) -> None:
+        self.index_path = None if index_path is None else Path(index_path)
+        self.entries = {}
+        self.scanned = 0
+        self.reused = 0
+
+        if self.index_path is not None and self.index_path.exists():
+            self.entries = self._read_entries()
+
+    def _read_entries(self) -> dict:
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if data.get("version") != METADATA_INDEX_VERSION:
+            return {}
+        return data.get("pages", {})
+
+    def scan(self, content_path: Path) -> None:
+        """
+            Bring the index up to date with the markdown files under `content_path`
+        """
+        content_path = Path(content_path)
+        entries = {}
+        stack = [content_path]
+        while len(stack) > 0:
+            with os.scandir(stack.pop()) as items:
+                for item in items:
+                    if item.is_dir():
+                        stack.append(Path(item.path))
+                        continue
+
+                    relative = Path(item.path).relative_to(content_path)
+                    key = relative.as_posix()
+                    stat = item.stat()
+                    entry = self.entries.get(key)
+                    if entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                        self.reused += 1
+                    else:
+                        entry = self._read_entry(Path(item.path), relative)
+                        entry["mtime_ns"] = stat.st_mtime_ns
+                        entry["size"] = stat.st_size
+                        self.scanned += 1
+                    entries[key] = entry
+        self.entries = entries
+
+    def _read_entry(self, path: Path, relative: Path) -> dict:
+        try:
+            (metadata, title) = read_page_header(path)
+        except (OSError, ValueError) as error:
+            return { "url": page_url(relative), "error": str(error) }
+        return {
+            "url": page_url(relative),
+            "title": title if title is not None else metadata.get("title"),
+            "metadata": metadata,
+        }
+
+    def pages(self) -> list[dict]:
+        """
+            List every indexed page, ordered by URL
+        """
+        return sorted((entry for entry in self.entries.values() if "error" not in entry), key=lambda entry: entry["url"])
+
+    def errors(self) -> dict[str, str]:
+        """
+            Map the source path of every file whose header could not be read to the reason
+        """
+        return { key: entry["error"] for (key, entry) in sorted(self.entries.items()) if "error" in entry }
+
+    def group_by(self, key: str) -> dict[str, list[dict]]:
+        """
+            Group pages by the value of front matter field `key`, such as `tags`
+
+            Pages listing several values appear in each of their groups; pages without the field are left out.
+        """
+        groups = {}
+        for entry in self.pages():
+            value = entry["metadata"].get(key)
+            if value is None:
+                continue
+            for group in (value if isinstance(value, list) else [value]):
+                groups.setdefault(str(group), []).append(entry)
+        return groups
+
+    def save(self) -> None:
+        """
+            Write the index to disk
+        """
+        if self.index_path is None:
+            return
+        self.index_path.parent.mkdir(exist_ok=True, parents=True)
+        with open(self.index_path, mode = "w") as f:
+            json.dump({ "version": METADATA_INDEX_VERSION, "pages": self.entries }, f, indent=1, sort_keys=True)
@@ -0,0 +1,105 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+import filecmp
+import functools
+import os
+import tempfile
+
+from profiler import profiler
+
+@functools.cache
+def output_mode() -> int:
+    """
+        Permissions a plain `open` would give a new file, since temporary files are created private
+
+        Reads the umask from /proc where available, as setting it to read it back changes process state.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return 0o666 & ~int(line.split()[1], 8)
+    except OSError:
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+class OutputWriter():
+    """
+        Writes build outputs atomically, leaving files whose content is unchanged untouched
+
+        Each output is written to a temporary file next to it and moved into place with `os.replace`,
+        so readers never see a half-written file. When the new bytes match the existing file the
+        temporary file is discarded instead, preserving the mtime so downstream syncs skip it.
+        Directories created or seen are remembered, so each is made once per build rather than once per file.
+    """
+    def __init__(self) -> None:
+        self.directories = set()
+        self.written = 0
+        self.unchanged = 0
+
+    def make_dirs(self, directories: Iterable[Path]) -> None:
+        """
+            Create every directory in `directories` along with its parents, skipping ones already made
+        """
+        for directory in sorted(set(map(Path, directories))):
+            if directory in self.directories:
+                continue
+            directory.mkdir(exist_ok=True, parents=True)
+            self.directories.add(directory)
+            self.directories.update(directory.parents)
+
+    @contextmanager
+    def open(self, path: Path, mode: str = "w") -> Iterator[TextIO]:
+        """
+            Open a temporary file to write the output at `path` to, moving it into place on success
+        """
+        path = Path(path)
+        self.make_dirs([path.parent])
+        (fd, temp_path) = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with open(fd, mode = mode) as f:
+                yield f
+            self.commit(Path(temp_path), path)
+        except BaseException:
+            # Gone already if the failure came after it was moved into place or discarded
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def commit(self, temp_path: Path, path: Path) -> bool:
+        """
+            Move `temp_path` over `path` unless both hold the same bytes, returning whether `path` changed
+        """
+        if path.exists() and filecmp.cmp(temp_path, path, shallow=False):
+            os.unlink(temp_path)
+            self.unchanged += 1
+            if profiler.enabled:
+                profiler.add("outputs.unchanged")
+            return False
+
+        os.chmod(temp_path, output_mode())
+        os.replace(temp_path, path)
+        self.written += 1
+        if profiler.enabled:
+            profiler.add("outputs.written")
+        return True
+
+    def write_bytes(self, path: Path, content: bytes) -> bool:
+        """
+            Write `content` to `path` unless it already holds exactly those bytes, returning whether it changed
+        """
+        path = Path(path)
+        try:
+            if os.path.getsize(path) == len(content) and path.read_bytes() == content:
+                self.unchanged += 1
+                if profiler.enabled:
+                    profiler.add("outputs.unchanged")
+                return False
+        except OSError:
+            pass
+
+        with self.open(path, mode = "wb") as f:
+            f.write(content)
+        return True
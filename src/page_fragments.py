@@ -0,0 +1,143 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+
+from block_cache import BlockCache, renderer_version
+from image_size import image_markup
+from profiler import profiler
+
+class PageFragments():
+    """
+        The rendered HTML of each block of one page from its previous build, and the record of the current one
+
+        Used as the `cache` of `iter_block_nodes`: blocks whose text is unchanged since the previous build
+        are spliced back in from their stored fragment, and only inserted or edited blocks are rendered again.
+        Fragments are stored one per line as `<sha256 of block>\\t<JSON string of HTML>`. Only the offset of
+        each line is kept in memory, so even huge pages are rebuilt without loading the previous one whole.
+        The new record is written next to the old one and replaces it on `commit`, unless nothing changed.
+    """
+    def __init__(self, path: Path, version: str, fallback: BlockCache | None = None) -> None:
+        self.path = Path(path)
+        self.version = version
+        self.fallback = fallback
+        self.hits = 0
+        self.misses = 0
+        self.offsets = {}
+        self.old_keys = []
+        self.new_keys = []
+        self._old = None
+        self._new = None
+        self._new_path = None
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            f = open(self.path, mode = "rb")
+        except FileNotFoundError:
+            return
+
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get("version") != self.version:
+            f.close()
+            return
+
+        offset = f.tell()
+        for line in f:
+            key = line[:64].decode()
+            self.offsets[key] = offset
+            self.old_keys.append(key)
+            offset += len(line)
+        self._old = f
+
+    def key(self, block: str) -> str:
+        return hashlib.sha256(block.encode()).hexdigest()
+
+    def _open_new(self) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        (fd, self._new_path) = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        self._new = open(fd, mode = "wb")
+        self._new.write(json.dumps({ "version": self.version }).encode() + b"\n")
+
+    def _record(self, key: str, html: str) -> None:
+        if self._new is None:
+            self._open_new()
+        self._new.write(f"{key}\t{json.dumps(html)}\n".encode())
+        self.new_keys.append(key)
+
+    def get(self, block: str) -> str | None:
+        key = self.key(block)
+        offset = self.offsets.get(key)
+        if offset is not None:
+            self._old.seek(offset)
+            html = json.loads(self._old.readline()[65:])
+            self.hits += 1
+            self._record(key, html)
+            return html
+
+        self.misses += 1
+        html = None if self.fallback is None else self.fallback.get(block)
+        if html is not None:
+            self._record(key, html)
+        return html
+
+    def put(self, block: str, html: str) -> None:
+        self._record(self.key(block), html)
+        if self.fallback is not None:
+            self.fallback.put(block, html)
+
+    def commit(self) -> None:
+        """
+            Replace the stored record with this build's, unless every block was reused in the same order
+        """
+        if self.fallback is not None:
+            self.fallback.commit()
+        if profiler.enabled:
+            profiler.add("page_fragments.hits", self.hits)
+            profiler.add("page_fragments.misses", self.misses)
+
+        unchanged = self.misses == 0 and self.new_keys == self.old_keys and self._old is not None
+        if self._new is None and not unchanged:
+            self._open_new()
+        if self._new is not None:
+            self._new.close()
+            self._new = None
+            if unchanged:
+                os.unlink(self._new_path)
+            else:
+                os.replace(self._new_path, self.path)
+            self._new_path = None
+        self.close()
+
+    def close(self) -> None:
+        """
+            Release the previous record, discarding the new one if it was never committed
+        """
+        if self._old is not None:
+            self._old.close()
+            self._old = None
+        if self._new is not None:
+            self._new.close()
+            os.unlink(self._new_path)
+            self._new = None
+            self._new_path = None
+
+class FragmentStore():
+    """
+        Directory of `PageFragments` records, one file per source page
+
+        Records are tied to the renderer version, so they never outlive the code that produced them.
+    """
+    def __init__(self, cache_dir: str, version: str | None = None) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.version = renderer_version() if version is None else version
+
+    def page(self, source_path: str, fallback: BlockCache | None = None) -> PageFragments:
+        name = hashlib.sha256(os.fspath(Path(source_path).resolve()).encode()).hexdigest()[:32]
+        # Image dimensions change how blocks render, so records made with and without them are kept apart
+        version = self.version + (":images" if image_markup.enabled else "")
+        return PageFragments(Path.joinpath(self.cache_dir, f"{name}.fragments"), version, fallback)
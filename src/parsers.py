@@ -1,49 +1,34 @@
 from textnode import TextNode, TextType
-from utilities import format_markdown_image, format_markdown_link
+from profiler import profiled
 import re
 
+# Expression to capture markdown image
+# Group 1: Alt Text
+# Group 2: Image URL
+IMAGE_EXPR = re.compile(r"!\[([^\]]*)\]\(([^\)]*)\)")
+
+# Expression to capture markdown link
+# Group 1: Anchor Text
+# Group 2: Link URL
+LINK_EXPR = re.compile(r"(?<!!)\[([^\]]*)\]\(([^\)]*)\)")
+
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
     """
         Extract all markdown image alt text and link from given text string
     """
-    image_info = []
-
-    # Expression to capture markdown image
-    # Group 1: Alt Text
-    # Group 2: Image URL
-    expr = "!\[([^\]]*)\]\(([^\)]*)\)"
-
-    matches = re.finditer(expr, text)
-
-    for match in matches:
-        alt = match.group(1)
-        url = match.group(2)
-        image_info.append((alt, url))
-
-    return image_info
+    return [ (match.group(1), match.group(2)) for match in IMAGE_EXPR.finditer(text) ]
 
 def extract_markdown_links(text) -> list[tuple[str, str]]:
     """
         Extract all markdown link text and link from given text string
     """
-    link_info = []
-    # Expression to capture markdown link
-    # Group 1: Anchor Text
-    # Group 2: Link Text
-    expr = "(?<!!)\[([^\]]*)\]\(([^\)]*)\)"
-
-    matches = re.finditer(expr, text)
-
-    for match in matches:
-        anchor = match.group(1)
-        link = match.group(2)
-        link_info.append((anchor, link))
+    return [ (match.group(1), match.group(2)) for match in LINK_EXPR.finditer(text) ]
 
-    return link_info
-
-def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
+def _split_nodes_expr(old_nodes: list[TextNode], expr: re.Pattern, text_type: TextType) -> list[TextNode]:
     """
-        Split a text node into text and image nodes
+        Split text nodes around every match of `expr`, whose groups are the node text and URL
+
+        Text between matches is sliced by the match offsets, so each node is scanned once.
     """
     nodes = []
 
@@ -52,64 +37,31 @@ def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
             nodes.append(node)
             continue
 
-        sub_nodes = []
-        image_info = extract_markdown_images(node.text)
-
-        remainder = node.text
-
-        for (alt, link) in image_info: 
-            # Create a text node from the text before the image and extract the remaining string
-            image_string = format_markdown_image(alt, link)
-            [pre_text, remainder] = remainder.split(image_string, 1)
-            
-            # Save the text node if it has content
-            if len(pre_text) > 0:
-                sub_nodes.append(TextNode(pre_text, TextType.TEXT))
+        position = 0
+        for match in expr.finditer(node.text):
+            # Save the text before the match if it has content
+            if match.start() > position:
+                nodes.append(TextNode(node.text[position:match.start()], TextType.TEXT))
+            nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
 
-            # Save the image node
-            sub_nodes.append(TextNode(alt, TextType.IMAGE, link))
-
-        if len(remainder) > 0:
-            sub_nodes.append(TextNode(remainder, TextType.TEXT))
-
-        nodes.extend(sub_nodes)
+        if position < len(node.text):
+            nodes.append(TextNode(node.text[position:], TextType.TEXT))
 
     return nodes
 
+def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
+    """
+        Split a text node into text and image nodes
+    """
+    return _split_nodes_expr(old_nodes, IMAGE_EXPR, TextType.IMAGE)
+
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     """
         Split a text node into text and link nodes
     """
-    nodes = []
+    return _split_nodes_expr(old_nodes, LINK_EXPR, TextType.LINK)
 
-    for node in old_nodes:
-        if not node.text_type == TextType.TEXT:
-            nodes.append(node)
-            continue
-
-        sub_nodes = []
-        image_info = extract_markdown_links(node.text)
-
-        remainder = node.text
-
-        for (alt, link) in image_info: 
-            # Create a text node from the text before the image and extract the remaining string
-            image_string = format_markdown_link(alt, link)
-            [pre_text, remainder] = remainder.split(image_string, 1)
-            
-            # Save the text node if it has content
-            if len(pre_text) > 0:
-                sub_nodes.append(TextNode(pre_text, TextType.TEXT))
-
-            # Save the image node
-            sub_nodes.append(TextNode(alt, TextType.LINK, link))
-
-        if len(remainder) > 0:
-            sub_nodes.append(TextNode(remainder, TextType.TEXT))
-
-        nodes.extend(sub_nodes)
-    return nodes
-  
 def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type: TextType) -> list[TextNode]:
     """
         Split a text node into the given text_type based on the containing delimeter
@@ -133,27 +85,45 @@ def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type:
 
         # Create expression to capture instance of text within delimiters
         expr = f"{escaped_delimiter}[^{escaped_delimiter}]*{escaped_delimiter}"
-        match = re.search(expr, node.text)
 
-        while not match is None:
-            pre = TextNode(substring[0:match.start()], TextType.TEXT)
+        # Walk the matches over the original string rather than re-searching a sliced copy after each one
+        position = 0
+        for match in re.finditer(expr, node.text):
+            pre = TextNode(node.text[position:match.start()], TextType.TEXT)
             block = TextNode(match.group().replace(delimiter, ''), text_type)
             sub_nodes.extend([pre, block])
-            substring = substring[match.end():] 
-            match = re.search(expr, substring)
+            position = match.end()
 
+        substring = node.text[position:]
         if len(substring) > 0:
             sub_nodes.append(TextNode(substring, TextType.TEXT))
 
         nodes.extend(sub_nodes)
     return nodes
 
-def text_to_textnodes(text: str) -> list[TextNode]:
+# Expression matching every inline element in a single scan, tried in priority order at each position
+# Group bold: Bold text
+# Group italic: Italic text
+# Group code: Inline code
+# Groups image_alt, image_url: Image alt text and URL
+# Groups link_text, link_url: Link anchor text and URL
+INLINE_EXPR = re.compile(
+    r"\*\*(?P<bold>[^*]*)\*\*"
+    r"|\*(?P<italic>[^*]+)\*"
+    r"|`(?P<code>[^`]*)`"
+    r"|!\[(?P<image_alt>[^\]]*)\]\((?P<image_url>[^\)]*)\)"
+    r"|\[(?P<link_text>[^\]]*)\]\((?P<link_url>[^\)]*)\)"
+)
+
+# Delimiter characters, which the split passes handle before anything else
+DELIMITER_EXPR = re.compile(r"[*`]")
+
+def split_text_to_textnodes(text: str) -> list[TextNode]:
     """
-        Parse a markdown string into TextNodes
+        Parse a markdown string into TextNodes with one split pass per element type
 
-        input: markdown string to be parsed
-        output: list of TextNodes representing the markdown 
+        Delimiters are split in the order bold, italic, code, then images and links, so earlier
+        passes win wherever elements overlap. This defines the output of `text_to_textnodes`.
     """
     nodes = [TextNode(text, TextType.TEXT)]
 
@@ -168,4 +138,68 @@ def text_to_textnodes(text: str) -> list[TextNode]:
     # Links
     nodes = split_nodes_link(nodes)
 
-    return nodes
\ No newline at end of file
+    return nodes
+
+def _scan_textnodes(text: str) -> list[TextNode] | None:
+    """
+        Parse a markdown string into TextNodes in one scan, or return None where that could differ from the split passes
+
+        The scan tries elements by position rather than by type, so it only agrees with the split passes when
+        no element holds a delimiter or image an earlier pass would have split on, no italic `*` touches another `*`
+        that the bold pass could pair it with, and no delimiter is left unmatched in the plain text.
+    """
+    nodes = []
+    position = 0
+
+    for match in INLINE_EXPR.finditer(text):
+        if match.start() > position:
+            if DELIMITER_EXPR.search(text, position, match.start()):
+                return None
+            nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+        position = match.end()
+
+        match match.lastgroup:
+            case "bold":
+                nodes.append(TextNode(match.group("bold"), TextType.BOLD))
+            case "italic":
+                if (match.start() > 0 and text[match.start() - 1] == '*') or text.startswith('*', position):
+                    return None
+                nodes.append(TextNode(match.group("italic"), TextType.ITALIC))
+            case "code":
+                if '*' in match.group("code"):
+                    return None
+                nodes.append(TextNode(match.group("code"), TextType.CODE))
+            case "image_url":
+                if DELIMITER_EXPR.search(match.group()):
+                    return None
+                nodes.append(TextNode(match.group("image_alt"), TextType.IMAGE, match.group("image_url")))
+            case "link_url":
+                # The image pass runs first, so an image starting inside the link text takes precedence
+                if DELIMITER_EXPR.search(match.group()) or "![" in match.group():
+                    return None
+                nodes.append(TextNode(match.group("link_text"), TextType.LINK, match.group("link_url")))
+
+    if position < len(text):
+        if DELIMITER_EXPR.search(text, position):
+            return None
+        nodes.append(TextNode(text[position:], TextType.TEXT))
+
+    return nodes
+
+@profiled("inline_parsing", count=lambda nodes: { "inline_nodes": len(nodes) })
+def text_to_textnodes(text: str) -> list[TextNode]:
+    """
+        Parse a markdown string into TextNodes
+
+        Every inline element (bold, italic, code, images and links) is found in one left-to-right scan
+        of the string, so parsing is linear in its length. Strings where delimiters nest or overlap,
+        and strings with unclosed delimiters, fall back to `split_text_to_textnodes`, which defines the
+        output in those cases and raises on unclosed delimiters.
+
+        input: markdown string to be parsed
+        output: list of TextNodes representing the markdown 
+    """
+    nodes = _scan_textnodes(text)
+    if nodes is None:
+        return split_text_to_textnodes(text)
+    return nodes
@@ -0,0 +1,120 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Iterator
+import functools
+import json
+import time
+
+class BuildProfiler():
+    """
+        Collects per-stage timings, counters and per-page timings for a build
+
+        Disabled by default; profiled functions then only pay for one attribute check per call.
+    """
+    def __init__(self) -> None:
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.pages = []
+        self.active = set()
+
+    def add(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] += amount
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.seconds[stage] += seconds
+        self.calls[stage] += 1
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """
+            Time the enclosed code as `stage`, ignoring nested entries into the same stage
+        """
+        if not self.enabled or stage in self.active:
+            yield
+            return
+
+        self.active.add(stage)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+            self.active.discard(stage)
+
+    @contextmanager
+    def page(self, path: str) -> Iterator[None]:
+        """
+            Time the enclosed code as the generation of the page at `path`
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.pages.append((time.perf_counter() - start, str(path)))
+            self.add("pages")
+
+    def to_dict(self, slowest: int = 10) -> dict:
+        return {
+            "stages": { stage: { "seconds": self.seconds[stage], "calls": self.calls[stage] } for stage in sorted(self.seconds, key=self.seconds.get, reverse=True) },
+            "counters": dict(sorted(self.counters.items())),
+            "slowest_pages": [ { "path": path, "seconds": seconds } for (seconds, path) in sorted(self.pages, reverse=True)[:slowest] ],
+        }
+
+    def report(self, slowest: int = 10) -> str:
+        data = self.to_dict(slowest)
+        lines = ["Stage                      Calls     Total (ms)"]
+        for (stage, timing) in data["stages"].items():
+            lines.append(f"{stage:<24} {timing['calls']:>8} {timing['seconds'] * 1000:>14.2f}")
+
+        lines.append("")
+        lines.append("Counters")
+        for (counter, value) in data["counters"].items():
+            lines.append(f"  {counter:<30} {value:>12}")
+
+        lines.append("")
+        lines.append("Slowest pages")
+        for page in data["slowest_pages"]:
+            lines.append(f"  {page['seconds'] * 1000:>10.2f} ms  {page['path']}")
+        return '\n'.join(lines)
+
+    def write_json(self, path: str, slowest: int = 10) -> None:
+        with open(path, mode = "w") as f:
+            json.dump(self.to_dict(slowest), f, indent=2)
+
+profiler = BuildProfiler()
+
+def profiled(stage: str, count: Callable[[object], dict] | None = None) -> Callable:
+    """
+        Decorator timing every call of a function as `stage` while the profiler is enabled
+
+        `count`, if given, maps the function's result to counters to add.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled or stage in profiler.active:
+                return func(*args, **kwargs)
+
+            profiler.active.add(stage)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                profiler.record(stage, time.perf_counter() - start)
+                profiler.active.discard(stage)
+
+            if count is not None:
+                for (counter, amount) in count(result).items():
+                    profiler.add(counter, amount)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,223 @@
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+import asyncio
+import hashlib
+import mimetypes
+import os
+import threading
+
+from converters.html_converters import markdown_to_page
+from front_matter import split_front_matter, template_value
+from templates import load_template
+
+STATUS_TEXT = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+def render_page(from_path: Path, template_path: Path) -> str:
+    """
+        Render a markdown file into the template, the same way `generate_page` does, returning the HTML
+    """
+    with open(from_path) as f:
+        markdown = f.read()
+
+    (metadata, markdown) = split_front_matter(markdown)
+    (title, content) = markdown_to_page(markdown)
+    values = { key: template_value(value) for (key, value) in metadata.items() }
+    values["Title"] = title
+    values["Content"] = content
+    return load_template(template_path).render(values)
+
+class RenderCache():
+    """
+        LRU cache of rendered pages, invalidated when the source or template mtime changes
+    """
+    def __init__(self, capacity: int = 256) -> None:
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Requests render on worker threads, which share the cache
+        self.lock = threading.Lock()
+
+    def get(self, key: Path, version: tuple) -> bytes | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Path, version: tuple, body: bytes) -> None:
+        with self.lock:
+            self.entries[key] = (version, body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+class DevServer():
+    """
+        Preview server rendering pages from `content/` on demand and serving files from `static/`
+
+        Pages are rendered on first request and kept in a `RenderCache`; static files and pages
+        both answer conditional requests with 304 Not Modified.
+    """
+    def __init__(self, content_path: Path, static_path: Path, template_path: Path, cache_size: int = 256) -> None:
+        self.content_path = Path(content_path).resolve()
+        self.static_path = Path(static_path).resolve()
+        self.template_path = Path(template_path)
+        self.cache = RenderCache(cache_size)
+
+    def resolve_page(self, url_path: str) -> Path | None:
+        """
+            Map a URL path to the markdown file that generates it
+
+            `/` and `/blog/` map to `index.md` in the matching directory, `/blog` to `blog/index.md`
+            or `blog.md`, and `/blog/post.html` to `blog/post.md`.
+        """
+        relative = url_path.strip('/')
+        if relative.endswith(".html"):
+            candidates = [relative[:-len(".html")] + ".md"]
+        elif relative == "":
+            candidates = ["index.md"]
+        else:
+            candidates = [f"{relative}/index.md", f"{relative}.md"]
+
+        for candidate in candidates:
+            path = self.safe_join(self.content_path, candidate)
+            if path is not None and path.is_file():
+                return path
+        return None
+
+    def safe_join(self, root: Path, relative: str) -> Path | None:
+        path = Path.joinpath(root, relative).resolve()
+        return path if path.is_relative_to(root) else None
+
+    def page_response(self, source: Path) -> tuple[bytes, dict]:
+        version = (os.stat(source).st_mtime_ns, os.stat(self.template_path).st_mtime_ns)
+        body = self.cache.get(source, version)
+        if body is None:
+            body = render_page(source, self.template_path).encode()
+            self.cache.put(source, version, body)
+
+        headers = {
+            "Content-Type": "text/html; charset=utf-8",
+            "ETag": f"\"{hashlib.sha1(body).hexdigest()}\"",
+            "Cache-Control": "no-cache",
+        }
+        return (body, headers)
+
+    def static_response(self, path: Path) -> tuple[bytes, dict]:
+        stat = os.stat(path)
+        with open(path, mode = "rb") as f:
+            body = f.read()
+
+        (content_type, _) = mimetypes.guess_type(path.name)
+        headers = {
+            "Content-Type": content_type or "application/octet-stream",
+            "ETag": f"\"{stat.st_size:x}-{stat.st_mtime_ns:x}\"",
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+        return (body, headers)
+
+    def respond(self, method: str, target: str, request_headers: dict) -> tuple[int, dict, bytes]:
+        """
+            Produce the status, headers and body for a request
+        """
+        if method not in ("GET", "HEAD"):
+            return (405, { "Allow": "GET, HEAD" }, b"")
+
+        url_path = unquote(urlsplit(target).path)
+        source = self.resolve_page(url_path)
+        if source is not None:
+            (body, headers) = self.page_response(source)
+        else:
+            path = self.safe_join(self.static_path, url_path.lstrip('/'))
+            if path is None or not path.is_file():
+                return (404, { "Content-Type": "text/plain; charset=utf-8" }, b"Not Found")
+            (body, headers) = self.static_response(path)
+
+        if not_modified(request_headers, headers):
+            return (304, headers, b"")
+        return (200, headers, body)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                parts = request_line.decode("latin-1").split()
+                request_headers = await read_headers(reader)
+                if len(parts) != 3:
+                    await send(writer, 400, {}, b"", False)
+                    break
+
+                (method, target, version) = parts
+                try:
+                    # Rendering is CPU-bound, so run it off the event loop to keep serving other requests
+                    (status, headers, body) = await asyncio.get_running_loop().run_in_executor(None, self.respond, method, target, request_headers)
+                except Exception as e:
+                    print(f"Failed to serve `{target}`: {e}")
+                    (status, headers, body) = (500, { "Content-Type": "text/plain; charset=utf-8" }, str(e).encode())
+
+                keep_alive = version == "HTTP/1.1" and request_headers.get("connection", "").lower() != "close"
+                await send(writer, status, headers, b"" if method == "HEAD" else body, keep_alive, len(body))
+                print(f"{method} {target} {status}")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "localhost", port: int = 8888) -> None:
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving `{self.content_path}` on http://{host}:{port}/")
+        async with server:
+            await server.serve_forever()
+
+def not_modified(request_headers: dict, response_headers: dict) -> bool:
+    """
+        Check a request's conditional headers against the response's validators
+    """
+    if "if-none-match" in request_headers:
+        tags = [tag.strip() for tag in request_headers["if-none-match"].split(',')]
+        return "*" in tags or response_headers.get("ETag") in tags
+
+    if "if-modified-since" in request_headers and "Last-Modified" in response_headers:
+        try:
+            return parsedate_to_datetime(response_headers["Last-Modified"]) <= parsedate_to_datetime(request_headers["if-modified-since"])
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+async def read_headers(reader: asyncio.StreamReader) -> dict:
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if line == "":
+            return headers
+        (name, _, value) = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+async def send(writer: asyncio.StreamWriter, status: int, headers: dict, body: bytes, keep_alive: bool, length: int | None = None) -> None:
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"]
+    lines.extend(f"{name}: {value}" for (name, value) in headers.items())
+    if status != 304:
+        lines.append(f"Content-Length: {len(body) if length is None else length}")
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode("latin-1") + body)
+    await writer.drain()
@@ -0,0 +1,223 @@
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+from xml.sax.saxutils import escape
+import heapq
+import json
+import os
+import re
+
+from htmlnode import HTMLNode
+from output_writer import OutputWriter
+
+SEARCH_INDEX_VERSION = 1
+
+# Files written into `public/` by `SiteOutputs`
+SITE_OUTPUT_FILES = ["sitemap.xml", "feed.xml", "search-index.json"]
+
+# Expression to capture a word worth indexing for search
+WORD_EXPR = re.compile(r"\w{2,}")
+
+# Tags rendered inside a line of text, which therefore do not separate words
+INLINE_TAGS = { "a", "b", "i", "code", "em", "strong", "span", "img" }
+
+# Expression to capture a trailing partial word, which may continue in the next chunk
+PARTIAL_WORD_EXPR = re.compile(r"\w*$")
+
+class PageText():
+    """
+        Incrementally extracts the search terms and a short summary from a page's HTML
+
+        Chunks may split tags and words anywhere, so the parser state carries over between `feed` calls.
+        Only the terms and the first `summary_length` characters of text are kept, not the whole text.
+    """
+    def __init__(self, summary_length: int = 300) -> None:
+        self.summary_length = summary_length
+        self.terms = set()
+        self.in_tag = False
+        self.tag = ""
+        self.partial = ""
+        self.summary_parts = []
+        self.summary_size = 0
+
+    def add_text(self, text: str) -> None:
+        text = self.partial + text
+        partial = PARTIAL_WORD_EXPR.search(text)
+        self.partial = partial.group(0)
+        complete = text[:partial.start()]
+
+        self.terms.update(word.lower() for word in WORD_EXPR.findall(complete))
+        if self.summary_size < self.summary_length:
+            self.summary_parts.append(complete)
+            self.summary_size += len(complete)
+
+    def feed(self, chunk: str) -> None:
+        position = 0
+        while position < len(chunk):
+            if self.in_tag:
+                end = chunk.find('>', position)
+                if end == -1:
+                    self.tag += chunk[position:]
+                    return
+                self.tag += chunk[position:end]
+                name = self.tag.lstrip('/').split(maxsplit=1)[0].lower() if self.tag.strip('/ ') != "" else ""
+                self.in_tag = False
+                self.tag = ""
+                position = end + 1
+                # Block-level tags separate words, as they would on screen
+                if name not in INLINE_TAGS:
+                    self.add_text(' ')
+            else:
+                start = chunk.find('<', position)
+                if start == -1:
+                    self.add_text(chunk[position:])
+                    return
+                self.add_text(chunk[position:start])
+                self.in_tag = True
+                position = start + 1
+
+    def summary(self) -> str:
+        self.add_text(' ')
+        text = ' '.join(''.join(self.summary_parts).split())
+        if len(text) <= self.summary_length:
+            return text
+        return text[:self.summary_length].rsplit(' ', 1)[0] + "…"
+
+class TextTap(HTMLNode):
+    """
+        Wraps a node so its HTML is fed to `readers`, such as a `PageText`, while it is serialized
+
+        Works with streamed content, which can only be serialized once.
+    """
+    __slots__ = ("node", "readers")
+
+    def __init__(self, node: HTMLNode, *readers) -> None:
+        super().__init__(node.tag)
+        self.node = node
+        self.readers = readers
+
+    def iter_html(self) -> Iterator[str]:
+        for chunk in self.node.iter_html():
+            for reader in self.readers:
+                reader.feed(chunk)
+            yield chunk
+
+    def to_html(self) -> str:
+        return ''.join(self.iter_html())
+
+def page_date(metadata: dict, source_path: str) -> str:
+    """
+        Date of a page as an RFC 3339 timestamp, from its `date` front matter or else the source's mtime
+    """
+    value = metadata.get("date")
+    if value is not None:
+        try:
+            date = datetime.fromisoformat(str(value))
+        except ValueError:
+            date = None
+        if date is not None:
+            if date.tzinfo is None:
+                date = date.replace(tzinfo=timezone.utc)
+            return date.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    mtime = os.path.getmtime(source_path)
+    return datetime.fromtimestamp(mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def summarize_page(title: str, metadata: dict, source_path: str, text: PageText, references: set[str]) -> dict:
+    """
+        Collect what the sitemap, feed, search index and link graph need from one generated page
+    """
+    return {
+        "title": title,
+        "date": page_date(metadata, source_path),
+        "summary": text.summary(),
+        "terms": sorted(text.terms),
+        "links": sorted(references),
+    }
+
+class SiteOutputs():
+    """
+        Writes `sitemap.xml`, an Atom `feed.xml` and `search-index.json` from page summaries as pages are generated
+
+        The sitemap is streamed to disk as pages arrive. Only the `feed_size` newest pages are held for the feed,
+        and the search index keeps just its postings: page numbers per term, delta-encoded, so the browser
+        can look terms up directly without indexing anything itself.
+    """
+    def __init__(self, public_path: Path, site_url: str, feed_title: str | None = None, feed_size: int = 20, writer: OutputWriter | None = None) -> None:
+        self.public_path = Path(public_path)
+        self.site_url = site_url.rstrip('/')
+        self.feed_title = feed_title
+        self.feed_size = feed_size
+        self.pages = []
+        self.postings = {}
+        self.newest = []
+        self.writer = OutputWriter() if writer is None else writer
+
+        # The sitemap is only moved into place once it is complete
+        self._files = ExitStack()
+        self.sitemap = self._files.enter_context(self.writer.open(Path.joinpath(self.public_path, "sitemap.xml")))
+        self.sitemap.write('<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
+    def page_url(self, dest_path: Path) -> str:
+        url = '/' + Path(dest_path).relative_to(self.public_path).as_posix()
+        # Only a page named exactly `index.html` is served as its directory
+        if url.endswith("/index.html"):
+            return url.removesuffix("index.html")
+        return url
+
+    def add(self, dest_path: Path, summary: dict) -> None:
+        """
+            Add the page written to `dest_path`, described by a summary from `summarize_page`
+        """
+        url = self.page_url(dest_path)
+        self.sitemap.write(f"  <url><loc>{escape(self.site_url + url)}</loc><lastmod>{summary['date']}</lastmod></url>\n")
+
+        number = len(self.pages)
+        self.pages.append([url, summary["title"]])
+        for term in summary["terms"]:
+            self.postings.setdefault(term, []).append(number)
+
+        if url == '/' and self.feed_title is None:
+            self.feed_title = summary["title"]
+
+        # Keep the newest pages in a bounded min-heap, ordered by date and then page number
+        entry = (summary["date"], number, url, summary["title"], summary["summary"])
+        if len(self.newest) < self.feed_size:
+            heapq.heappush(self.newest, entry)
+        elif entry > self.newest[0]:
+            heapq.heapreplace(self.newest, entry)
+
+    def write_feed(self) -> None:
+        entries = sorted(self.newest, reverse=True)
+        updated = entries[0][0] if len(entries) > 0 else "1970-01-01T00:00:00Z"
+        title = self.feed_title if self.feed_title is not None else self.site_url
+
+        with self.writer.open(Path.joinpath(self.public_path, "feed.xml")) as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n')
+            f.write(f"  <title>{escape(title)}</title>\n  <id>{escape(self.site_url)}/</id>\n  <updated>{updated}</updated>\n")
+            f.write(f"  <link href=\"{escape(self.site_url)}/\"/>\n  <link rel=\"self\" href=\"{escape(self.site_url)}/feed.xml\"/>\n")
+            for (date, _, url, entry_title, summary) in entries:
+                link = escape(self.site_url + url)
+                f.write(f"  <entry><title>{escape(entry_title)}</title><id>{link}</id><link href=\"{link}\"/><updated>{date}</updated><summary>{escape(summary)}</summary></entry>\n")
+            f.write("</feed>\n")
+
+    def write_search_index(self) -> None:
+        with self.writer.open(Path.joinpath(self.public_path, "search-index.json")) as f:
+            f.write(f"{{\"version\":{SEARCH_INDEX_VERSION},\"pages\":[")
+            f.write(','.join(json.dumps(page, separators=(',', ':'), ensure_ascii=False) for page in self.pages))
+            f.write("],\"terms\":{")
+            for (i, term) in enumerate(sorted(self.postings)):
+                numbers = self.postings[term]
+                deltas = [numbers[0]] + [ b - a for (a, b) in zip(numbers, numbers[1:]) ]
+                f.write(("," if i > 0 else "") + json.dumps(term, ensure_ascii=False) + ":" + json.dumps(deltas, separators=(',', ':')))
+            f.write("}}\n")
+
+    def close(self) -> list[Path]:
+        """
+            Finish the sitemap and write the feed and search index, returning the paths written
+        """
+        self.sitemap.write("</urlset>\n")
+        self._files.close()
+        self.write_feed()
+        self.write_search_index()
+        return [ Path.joinpath(self.public_path, name) for name in SITE_OUTPUT_FILES ]
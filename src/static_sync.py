@@ -0,0 +1,138 @@
+from pathlib import Path
+import os
+import shutil
+
+from manifest import hash_file
+
+LINK_MODES = ["copy", "hardlink", "copy_file_range"]
+
+class SyncReport():
+    def __init__(self) -> None:
+        self.copied = []
+        self.unchanged = []
+        self.removed = []
+
+    def __repr__(self) -> str:
+        return f"SyncReport(copied={len(self.copied)}, unchanged={len(self.unchanged)}, removed={len(self.removed)})"
+
+def files_match(src: os.DirEntry | Path, dest: Path, checksum: bool = False) -> bool:
+    """
+        Check whether `dest` is already an up to date copy of `src`
+
+        Files match when they share an inode, or have the same size and modification time.
+        With `checksum` set, same-sized files are compared by content hash instead of modification time.
+    """
+    try:
+        dest_stat = dest.stat()
+    except FileNotFoundError:
+        return False
+    src_stat = src.stat()
+
+    if (src_stat.st_dev, src_stat.st_ino) == (dest_stat.st_dev, dest_stat.st_ino):
+        return True
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(src) == hash_file(dest)
+    return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+def _copy_file_range(src: Path, dest: Path) -> None:
+    """
+        Copy inside the kernel, which lets filesystems that support it share extents (reflink) instead of duplicating data
+    """
+    with open(src, mode = "rb") as fsrc, open(dest, mode = "wb") as fdest:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdest.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+    shutil.copystat(src, dest)
+
+def copy_file(src: Path, dest: Path, link_mode: str = "copy") -> None:
+    """
+        Place a copy of `src` at `dest` using `link_mode`, falling back to a regular copy where unsupported
+    """
+    if dest.is_dir() and not dest.is_symlink():
+        shutil.rmtree(dest)
+    elif dest.exists() or dest.is_symlink():
+        dest.unlink()
+
+    if link_mode == "hardlink":
+        try:
+            os.link(src, dest)
+            return
+        except OSError:
+            pass
+    elif link_mode == "copy_file_range" and hasattr(os, "copy_file_range"):
+        try:
+            _copy_file_range(src, dest)
+            return
+        except OSError:
+            pass
+
+    # copy2 keeps the modification time, which later syncs compare against
+    shutil.copy2(src, dest)
+
+def sync_directory_contents(src: str, dest: str, checksum: bool = False, link_mode: str = "copy", keep: set[Path] | None = None, report: SyncReport | None = None, include: set[Path] | None = None) -> SyncReport:
+    """
+        Mirror `src` into `dest`, copying only new or changed files and deleting files that no longer exist in `src`
+
+        Paths in `keep` (such as generated pages) are never deleted from `dest`.
+        With `include`, only those paths of `src` (files and the directories holding them) are mirrored;
+        everything else is treated as absent.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode `{link_mode}`, expected one of {LINK_MODES}")
+
+    keep = set() if keep is None else keep
+    report = SyncReport() if report is None else report
+    src = Path(src)
+    dest = Path(dest)
+    dest.mkdir(exist_ok=True, parents=True)
+
+    names = set()
+    with os.scandir(src) as entries:
+        for entry in entries:
+            if include is not None and Path(entry.path) not in include:
+                continue
+            names.add(entry.name)
+            dest_path = Path.joinpath(dest, entry.name)
+            if entry.is_dir():
+                if dest_path.exists() and not dest_path.is_dir():
+                    dest_path.unlink()
+                sync_directory_contents(entry.path, dest_path, checksum, link_mode, keep, report, include)
+            elif files_match(entry, dest_path, checksum):
+                report.unchanged.append(dest_path)
+            else:
+                copy_file(Path(entry.path), dest_path, link_mode)
+                report.copied.append(dest_path)
+
+    with os.scandir(dest) as entries:
+        for entry in entries:
+            if entry.name in names:
+                continue
+            dest_path = Path(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                _remove_directory(dest_path, keep, report)
+            elif dest_path not in keep:
+                dest_path.unlink()
+                report.removed.append(dest_path)
+
+    return report
+
+def _remove_directory(path: Path, keep: set[Path], report: SyncReport) -> None:
+    """
+        Remove everything under `path` except kept files, and the directory itself once empty
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            entry_path = Path(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                _remove_directory(entry_path, keep, report)
+            elif entry_path not in keep:
+                entry_path.unlink()
+                report.removed.append(entry_path)
+
+    if not any(path.iterdir()):
+        path.rmdir()
@@ -0,0 +1,75 @@
+from typing import TextIO
+import os
+import re
+
+from htmlnode import HTMLNode
+
+# Expression to capture a template slot such as `{{ Title }}`
+# Group 1: Slot name
+SLOT_EXPR = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+class Template():
+    """
+        A template compiled into alternating literal segments and named slots
+
+        `segments` always has one more entry than `slots`; rendering interleaves the two.
+    """
+    def __init__(self, segments: list[str], slots: list[str]) -> None:
+        self.segments = segments
+        self.slots = slots
+
+    def render(self, values: dict) -> str:
+        """
+            Fill the template's slots from `values`, leaving unknown slots empty
+        """
+        parts = [self.segments[0]]
+        for (slot, segment) in zip(self.slots, self.segments[1:]):
+            value = values.get(slot, "")
+            parts.append(value.to_html() if isinstance(value, HTMLNode) else str(value))
+            parts.append(segment)
+        return ''.join(parts)
+
+    def write(self, stream: TextIO, values: dict) -> None:
+        """
+            Write the filled template to `stream`, streaming any `HTMLNode` values instead of materializing them
+        """
+        stream.write(self.segments[0])
+        for (slot, segment) in zip(self.slots, self.segments[1:]):
+            value = values.get(slot, "")
+            if isinstance(value, HTMLNode):
+                value.write_html(stream)
+            else:
+                stream.write(str(value))
+            stream.write(segment)
+
+def parse_template(text: str) -> Template:
+    """
+        Compile template text into a `Template`
+    """
+    segments = []
+    slots = []
+    position = 0
+    for match in SLOT_EXPR.finditer(text):
+        segments.append(text[position:match.start()])
+        slots.append(match.group(1))
+        position = match.end()
+    segments.append(text[position:])
+    return Template(segments, slots)
+
+_template_cache = {}
+
+def load_template(path: str) -> Template:
+    """
+        Load and compile the template at `path`, reusing the compiled template until the file's mtime changes
+    """
+    key = os.fspath(path)
+    mtime = os.stat(key).st_mtime_ns
+
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(key) as f:
+        template = parse_template(f.read())
+    _template_cache[key] = (mtime, template)
+    return template
@@ -0,0 +1,145 @@
+import unittest
+import gzip
+import io
+import os
+import tempfile
+from pathlib import Path
+
+from assets import AssetPipeline, hashed_name, resolve_reference, uncompressed_path, walk_files
+
+class TestHelpers(unittest.TestCase):
+    def test_hashed_name(self):
+        name = hashed_name(Path("images/logo.png"), b"png")
+        self.assertEqual(name.parent, Path("images"))
+        self.assertRegex(name.name, r"^logo\.[0-9a-f]{10}\.png$")
+        self.assertEqual(name, hashed_name(Path("images/logo.png"), b"png"))
+        self.assertNotEqual(name, hashed_name(Path("images/logo.png"), b"gif"))
+
+    def test_resolve_reference(self):
+        self.assertEqual(resolve_reference("/index.css", "/blog"), "/index.css")
+        self.assertEqual(resolve_reference("../images/a.png?v=1", "/css"), "/images/a.png")
+        self.assertIsNone(resolve_reference("https://example.com/a.png", "/"))
+        self.assertIsNone(resolve_reference("#top", "/"))
+
+    def test_uncompressed_path(self):
+        self.assertEqual(uncompressed_path(Path("css/site.css.br")), Path("css/site.css"))
+        self.assertEqual(uncompressed_path(Path("css/site.css")), Path("css/site.css"))
+
+class TestAssetPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.static = root / "static"
+        self.public = root / "public"
+        (self.static / "images").mkdir(parents=True)
+        (self.static / "css").mkdir()
+        (self.static / "images" / "bg.png").write_bytes(b"png")
+        (self.static / "css" / "site.css").write_text("body { background: url('../images/bg.png'); }")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_walk_files(self):
+        self.assertEqual(set(walk_files(self.static)), { Path("images/bg.png"), Path("css/site.css") })
+
+    def test_plain_copy(self):
+        mapping = AssetPipeline(self.static, self.public, hash_names=False).run()
+        self.assertEqual(mapping["/images/bg.png"], "/images/bg.png")
+        self.assertEqual((self.public / "images" / "bg.png").read_bytes(), b"png")
+
+    def test_hashed_names_and_css_rewrite(self):
+        mapping = AssetPipeline(self.static, self.public).run()
+        image = mapping["/images/bg.png"]
+        self.assertTrue((self.public / image.lstrip('/')).exists())
+        css = (self.public / mapping["/css/site.css"].lstrip('/')).read_text()
+        self.assertEqual(css, f"body {{ background: url('{image}'); }}")
+        self.assertTrue((self.public / "asset-manifest.json").exists())
+
+    def test_rewrite_html(self):
+        pipeline = AssetPipeline(self.static, self.public)
+        mapping = pipeline.run()
+        page = self.public / "blog" / "index.html"
+        page.parent.mkdir()
+        page.write_text('<link href="/css/site.css"><img src="../images/bg.png"><a href="https://example.com">x</a>')
+        pipeline.rewrite_html([page])
+        self.assertEqual(page.read_text(), f'<link href="{mapping["/css/site.css"]}"><img src="{mapping["/images/bg.png"]}"><a href="https://example.com">x</a>')
+
+    def test_rewrite_html_after_asset_change(self):
+        page = self.public / "index.html"
+        pipeline = AssetPipeline(self.static, self.public)
+        pipeline.run()
+        page.write_text('<link href="/css/site.css"><img src="/images/bg.png">')
+        pipeline.rewrite_html([page])
+
+        # An incremental build skips the unchanged page, which still holds the previous hashed names
+        (self.static / "css" / "site.css").write_text("body { color: red; }")
+        pipeline = AssetPipeline(self.static, self.public)
+        mapping = pipeline.run()
+        pipeline.rewrite_html([page])
+        self.assertEqual(page.read_text(), f'<link href="{mapping["/css/site.css"]}"><img src="{mapping["/images/bg.png"]}">')
+
+    def test_original_path(self):
+        pipeline = AssetPipeline(self.static, self.public)
+        pipeline.run()
+        references = pipeline.references()
+        self.assertEqual(references.original_path("/css/site.0123456789.css"), "/css/site.css")
+        self.assertEqual(references.original_path("/images/bg.png"), "/images/bg.png")
+        self.assertIsNone(references.original_path("/css/other.0123456789.css"))
+        self.assertIsNone(AssetPipeline(self.static, self.public, hash_names=False).references())
+
+    def test_rewrite_while_writing(self):
+        pipeline = AssetPipeline(self.static, self.public)
+        mapping = pipeline.run()
+        stream = io.StringIO()
+        page = pipeline.references().wrap(stream, self.public / "blog" / "index.html")
+        page.write('<link href="../css/site.css">')
+        page.writelines(['<img src="/images/bg.png">', "<p>text</p>"])
+        self.assertEqual(stream.getvalue(), f'<link href="{mapping["/css/site.css"]}"><img src="{mapping["/images/bg.png"]}"><p>text</p>')
+
+    def test_unchanged_assets_keep_mtime(self):
+        pipeline = AssetPipeline(self.static, self.public)
+        mapping = pipeline.run()
+        image = self.public / mapping["/images/bg.png"].lstrip('/')
+        os.utime(image, ns=(1, 1))
+        pipeline = AssetPipeline(self.static, self.public)
+        pipeline.run()
+        self.assertEqual(image.stat().st_mtime_ns, 1)
+        self.assertEqual(pipeline.writer.written, 0)
+
+    def test_prune_everything_not_written(self):
+        page = self.public / "blog" / "index.html"
+        stale = [self.public / "old" / "gone.html", self.public / "images" / "removed.png"]
+        for path in [page, page.with_name("index.html.gz")] + stale:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+        pipeline = AssetPipeline(self.static, self.public, hash_names=False)
+        pipeline.run()
+        self.assertEqual(sorted(pipeline.prune({ page })), sorted(stale))
+        self.assertEqual(sorted(walk_files(self.public)), [Path("blog/index.html"), Path("blog/index.html.gz"), Path("css/site.css"), Path("images/bg.png")])
+
+    def test_prune_older_hashed_names(self):
+        pipeline = AssetPipeline(self.static, self.public)
+        old = self.public / pipeline.run()["/css/site.css"].lstrip('/')
+        old.with_name(old.name + ".gz").write_text("x")
+        (self.static / "css" / "site.css").write_text("body { color: red; }")
+        (self.public / "index.html").write_text("x")
+
+        pipeline = AssetPipeline(self.static, self.public)
+        mapping = pipeline.run()
+        self.assertEqual(sorted(pipeline.prune(set(), hashed_only=True)), [old, old.with_name(old.name + ".gz")])
+        self.assertEqual(sorted(walk_files(self.public)), sorted([Path("asset-manifest.json"), Path("index.html")] + [ Path(target.lstrip('/')) for target in mapping.values() ]))
+
+    def test_precompress_text_assets(self):
+        mapping = AssetPipeline(self.static, self.public, hash_names=False, compress=True).run()
+        compressed = self.public / "css" / "site.css.gz"
+        self.assertEqual(gzip.decompress(compressed.read_bytes()), (self.static / "css" / "site.css").read_bytes())
+        self.assertFalse((self.public / "images" / "bg.png.gz").exists())
+
+    def test_precompress_settings(self):
+        (self.static / "small.css").write_text("a {}")
+        AssetPipeline(self.static, self.public, hash_names=False, compress=True, formats=["gzip"], min_size=16).run()
+        self.assertEqual(sorted(path.name for path in (self.public / "css").iterdir()), ["site.css", "site.css.gz"])
+        self.assertFalse((self.public / "small.css.gz").exists())
+
+if __name__ == "__main__":
+    unittest.main()
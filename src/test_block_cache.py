@@ -0,0 +1,84 @@
+import unittest
+import pickle
+import tempfile
+
+from block_cache import BlockCache
+from converters.html_converters import markdown_to_html_node
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_persists_across_instances(self):
+        cache = BlockCache(self.tmp.name, version="1")
+        self.assertIsNone(cache.get("**block**"))
+        cache.put("**block**", "<p><b>block</b></p>")
+        cache.close()
+
+        cache = BlockCache(self.tmp.name, version="1")
+        self.assertEqual(cache.get("**block**"), "<p><b>block</b></p>")
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        cache.close()
+
+    def test_version_change_clears(self):
+        cache = BlockCache(self.tmp.name, version="1")
+        cache.put("block", "<p>block</p>")
+        cache.close()
+
+        cache = BlockCache(self.tmp.name, version="2")
+        self.assertIsNone(cache.get("block"))
+        cache.close()
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(self.tmp.name, max_bytes=20, version="1")
+        cache.put("a", "<p>aaaaaa</p>")
+        cache.commit()
+        cache.put("b", "<p>bbbbbb</p>")
+        cache.commit()
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "<p>bbbbbb</p>")
+        cache.close()
+
+    def test_limit_counts_other_instances(self):
+        first = BlockCache(self.tmp.name, max_bytes=30, version="1")
+        second = BlockCache(self.tmp.name, max_bytes=30, version="1")
+        first.put("a", "<p>aaaaaa</p>")
+        first.commit()
+        second.put("b", "<p>bbbbbb</p>")
+        second.commit()
+        first.put("c", "<p>cccccc</p>")
+        first.commit()
+        first.put("d", "<p>dddddd</p>")
+        first.commit()
+        # Crossing the limit recounts the entries the second instance added, then evicts down to it
+        self.assertIsNone(first.get("a"))
+        self.assertIsNone(first.get("b"))
+        self.assertEqual(first.get("d"), "<p>dddddd</p>")
+        self.assertEqual(first._total, 26)
+        first.close()
+        second.close()
+
+    def test_pickle(self):
+        cache = BlockCache(self.tmp.name, version="1")
+        cache.put("block", "<p>block</p>")
+        cache.commit()
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(copy.get("block"), "<p>block</p>")
+        copy.close()
+        cache.close()
+
+    def test_markdown_to_html_node_with_cache(self):
+        markdown = "# Title\n\nSome **bold** text\n\n* one\n* two"
+        expected = markdown_to_html_node(markdown).to_html()
+
+        cache = BlockCache(self.tmp.name, version="1")
+        self.assertEqual(markdown_to_html_node(markdown, cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(markdown, cache).to_html(), expected)
+        self.assertEqual(cache.hits, 3)
+        cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import gzip
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from compression import OutputCompressor, compress_file, compressed_siblings
+
+class TestCompressFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_gzip_roundtrip(self):
+        page = self.root / "index.html"
+        page.write_text("<p>hello</p>" * 200)
+        written = compress_file(page, ["gzip"])
+        self.assertEqual(written, [self.root / "index.html.gz"])
+        self.assertEqual(gzip.decompress(written[0].read_bytes()), page.read_bytes())
+
+    def test_output_is_deterministic(self):
+        page = self.root / "index.html"
+        page.write_text("<p>hello</p>" * 200)
+        first = compress_file(page, ["gzip"])[0].read_bytes()
+        second = compress_file(page, ["gzip"])[0].read_bytes()
+        self.assertEqual(first, second)
+
+    def test_skips_binary_suffixes(self):
+        image = self.root / "logo.png"
+        image.write_bytes(b"\x89PNG" * 1000)
+        self.assertEqual(compress_file(image, ["gzip"]), [])
+        self.assertFalse((self.root / "logo.png.gz").exists())
+
+    def test_small_files_drop_stale_siblings(self):
+        page = self.root / "index.html"
+        page.write_text("<p>hello</p>" * 200)
+        compress_file(page, ["gzip"], min_size=100)
+        page.write_text("<p>hi</p>")
+        self.assertEqual(compress_file(page, ["gzip"], min_size=100), [])
+        self.assertFalse((self.root / "index.html.gz").exists())
+
+    def test_siblings(self):
+        self.assertEqual(compressed_siblings(Path("a/b.css"), ["gzip"]), [Path("a/b.css.gz")])
+
+class TestOutputCompressor(unittest.TestCase):
+    def test_compresses_in_background(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pages = [ Path(tmp) / f"page{i}.html" for i in range(4) ]
+            for page in pages:
+                page.write_text("<p>hello</p>" * 200)
+            compressor = OutputCompressor(["gzip"], min_size=0)
+            for page in pages:
+                compressor.submit(page)
+            written = compressor.wait()
+            compressor.close()
+            self.assertEqual(sorted(written), sorted(page.with_name(page.name + ".gz") for page in pages))
+
+    def test_unpickled_is_synchronous(self):
+        compressor = pickle.loads(pickle.dumps(OutputCompressor(["gzip"], min_size=10)))
+        self.assertTrue(compressor.synchronous)
+        self.assertEqual(compressor.min_size, 10)
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            OutputCompressor(["lzma-ultra"])
+
+if __name__ == "__main__":
+    unittest.main()
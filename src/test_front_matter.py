@@ -0,0 +1,52 @@
+import unittest
+
+from front_matter import parse_front_matter, read_front_matter, split_front_matter, template_value
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split(self):
+        markdown = "---\ntitle: Hello\ndraft: false\norder: 3\n---\n# Heading\n\nBody"
+        (metadata, body) = split_front_matter(markdown)
+        self.assertEqual(metadata, { "title": "Hello", "draft": False, "order": 3 })
+        self.assertEqual(body, "# Heading\n\nBody")
+
+    def test_without_front_matter(self):
+        markdown = "# Heading\n\n---"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_lists(self):
+        metadata = parse_front_matter([
+            "tags: [python, 'static sites']",
+            "# a comment",
+            "authors:",
+            "  - Ann",
+            "  - Bo",
+            "date: \"2024-01-02\"",
+        ])
+        self.assertEqual(metadata, {
+            "tags": ["python", "static sites"],
+            "authors": ["Ann", "Bo"],
+            "date": "2024-01-02",
+        })
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["title: ok", "not a field"])
+
+    def test_unclosed(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ntitle: Hello\n# Heading")
+
+    def test_read_leaves_body_unread(self):
+        lines = iter(["---\n", "title: Hello\n", "---\n", "# Heading\n", "rest\n"])
+        (metadata, body) = read_front_matter(lines)
+        self.assertEqual(metadata, { "title": "Hello" })
+        self.assertEqual(next(body), "# Heading\n")
+        self.assertEqual(list(lines), ["rest\n"])
+
+    def test_template_value(self):
+        self.assertEqual(template_value(["a", "b"]), "a, b")
+        self.assertEqual(template_value(True), "true")
+        self.assertEqual(template_value(4), "4")
+
+if __name__ == "__main__":
+    unittest.main()
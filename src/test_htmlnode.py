@@ -1,4 +1,5 @@
 import unittest
+import io
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -25,6 +26,15 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode('div', children=[HTMLNode('div', children=[HTMLNode('p', 'second layer!')]), HTMLNode('p', 'first layer!')])
         expected = """<div><div><p>second layer!</p></div><p>first layer!</p></div>"""
 
+    def test_no_instance_dict(self):
+        for node in [HTMLNode('p', 'text'), LeafNode('b', 'bold'), ParentNode('div', [])]:
+            with self.assertRaises(AttributeError):
+                node.__dict__
+
+    def test_interned_tag(self):
+        tag = ''.join(['h', '1'])
+        self.assertIs(LeafNode(tag, 'heading').tag, LeafNode('h1', 'heading').tag)
+
 class TestLeafNode(unittest.TestCase):
     def test_no_tag(self):
         node = LeafNode(None, 'Leaf!')
@@ -70,5 +80,27 @@ class TestParentNode(unittest.TestCase):
             node.to_html()
         self.assertEqual("ParentNode must have children", str(ctx.exception))
 
+class TestStreamingHTML(unittest.TestCase):
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "text "), LeafNode("b", "bold")]), LeafNode("p", "leaf")], props={ "class": "page" })
+        self.assertEqual(''.join(node.iter_html()), """<div class="page"><p>text <b>bold</b></p><p>leaf</p></div>""")
+
+    def test_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "one")]), ParentNode("li", [LeafNode(None, "two")])])
+        stream = io.StringIO()
+        node.write_html(stream)
+        self.assertEqual(stream.getvalue(), node.to_html())
+
+    def test_deep_tree(self):
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("div", [node])
+        self.assertEqual(node.to_html(), "<div>" * 5000 + "deep" + "</div>" * 5000)
+
+    def test_nested_without_children(self):
+        with self.assertRaises(ValueError):
+            node = ParentNode("div", [ParentNode("p", None)])
+            node.to_html()
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+import os
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import image_size
+from converters.text_node_converters import text_node_to_html_node
+from image_size import ImageMarkup, image_markup, read_image_size
+from textnode import TextNode, TextType
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00" + b"\x00" * 20
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof + b"\xff\xd9"
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size_of(self, content):
+        path = self.root / "image"
+        path.write_bytes(content)
+        return read_image_size(path)
+
+    def test_png(self):
+        self.assertEqual(self.size_of(png(1344, 896)), (1344, 896))
+
+    def test_gif(self):
+        self.assertEqual(self.size_of(b"GIF89a" + struct.pack("<HH", 40, 30) + b"\x00" * 20), (40, 30))
+
+    def test_jpeg(self):
+        self.assertEqual(self.size_of(jpeg(640, 480)), (640, 480))
+
+    def test_webp(self):
+        lossy = b"RIFF\x00\x00\x00\x00WEBPVP8 " + b"\x00" * 10 + struct.pack("<HH", 300, 200)
+        self.assertEqual(self.size_of(lossy), (300, 200))
+        bits = (300 - 1) | ((200 - 1) << 14)
+        lossless = b"RIFF\x00\x00\x00\x00WEBPVP8L" + b"\x00" * 4 + b"\x2f" + bits.to_bytes(4, "little") + b"\x00" * 5
+        self.assertEqual(self.size_of(lossless), (300, 200))
+        extended = b"RIFF\x00\x00\x00\x00WEBPVP8X" + b"\x00" * 8 + (300 - 1).to_bytes(3, "little") + (200 - 1).to_bytes(3, "little")
+        self.assertEqual(self.size_of(extended), (300, 200))
+
+    def test_unknown_format(self):
+        self.assertIsNone(self.size_of(b"<svg></svg>"))
+        self.assertIsNone(self.size_of(b"\xff\xd8\xff"))
+
+class TestImageMarkup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = Path(self.tmp.name)
+        (self.static / "images").mkdir()
+        (self.static / "images" / "a.png").write_bytes(png(10, 20))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        image_markup.configure(None)
+
+    def test_probes_each_image_once(self):
+        markup = ImageMarkup()
+        markup.configure(self.static)
+        with mock.patch.object(image_size, "read_image_size", wraps=read_image_size) as probe:
+            self.assertEqual(markup.size("/images/a.png"), (10, 20))
+            self.assertEqual(markup.size("/images/a.png?v=2"), (10, 20))
+            self.assertEqual(probe.call_count, 1)
+
+            (self.static / "images" / "a.png").write_bytes(png(30, 40))
+            os.utime(self.static / "images" / "a.png", ns=(1, 1))
+            self.assertEqual(markup.size("/images/a.png"), (30, 40))
+            self.assertEqual(probe.call_count, 2)
+
+    def test_missing_or_relative_images(self):
+        markup = ImageMarkup()
+        markup.configure(self.static)
+        self.assertIsNone(markup.size("/images/missing.png"))
+        self.assertIsNone(markup.size("images/a.png"))
+        self.assertEqual(markup.attributes("https://example.com/a.png"), { "loading": "lazy", "decoding": "async" })
+
+    def test_image_node(self):
+        node = TextNode("alt", TextType.IMAGE, "/images/a.png")
+        self.assertEqual(text_node_to_html_node(node).props, { "src": "/images/a.png", "alt": "alt" })
+        image_markup.configure(self.static)
+        self.assertEqual(
+            text_node_to_html_node(node).props_to_html(),
+            ' src="/images/a.png" alt="alt" width="10" height="20" loading="lazy" decoding="async"'
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from htmlnode import LeafNode
+from inline_cache import InlineCache
+from profiler import profiler
+
+class TestInlineCache(unittest.TestCase):
+    def test_renders_inline_markdown(self):
+        cache = InlineCache()
+        self.assertEqual(
+            [ node.to_html() for node in cache.render("a **b** `c`") ],
+            ["a ", "<b>b</b>", " ", "<code>c</code>"]
+        )
+
+    def test_counts_hits_and_misses(self):
+        cache = InlineCache()
+        cache.render("item *one*")
+        cache.render("item *one*")
+        cache.render("item two")
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_returns_new_lists(self):
+        cache = InlineCache()
+        first = cache.render("text")
+        first.append(LeafNode(None, "extra"))
+        self.assertEqual(len(cache.render("text")), 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = InlineCache(capacity=2)
+        cache.render("a")
+        cache.render("b")
+        cache.render("a")
+        cache.render("c")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+
+    def test_long_strings_are_not_stored(self):
+        cache = InlineCache(max_length=10)
+        cache.render("a much longer line of text")
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_errors_are_not_cached(self):
+        cache = InlineCache()
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                cache.render("unclosed **bold")
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_reports_to_profiler(self):
+        cache = InlineCache()
+        profiler.reset()
+        profiler.enabled = True
+        try:
+            cache.render("x")
+            cache.render("x")
+        finally:
+            profiler.enabled = False
+        self.assertEqual(profiler.counters["inline_cache.hits"], 1)
+        self.assertEqual(profiler.counters["inline_cache.misses"], 1)
+        profiler.reset()
+
+if __name__ == "__main__":
+    unittest.main()
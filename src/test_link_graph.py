@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from link_graph import LinkCollector, LinkGraph, reachable_assets
+
+class TestLinkCollector(unittest.TestCase):
+    def test_collects_references(self):
+        collector = LinkCollector()
+        collector.feed('<p>See <a href="/docs/">docs</a></p>')
+        collector.feed('<img src="images/a.png" alt="a"></img>')
+        self.assertEqual(collector.references, { "/docs/", "images/a.png" })
+
+class TestLinkGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.public = self.root / "public"
+        self.static = self.root / "static"
+        (self.static / "images").mkdir(parents=True)
+        (self.static / "site.css").write_text("body { background: url('images/bg.png') }")
+        (self.static / "unused.css").write_text("body { background: url('images/unused-bg.png') }")
+        for name in ["logo.png", "bg.png", "unused-bg.png", "old.png"]:
+            (self.static / "images" / name).write_bytes(b"")
+        self.template = self.root / "template.html"
+        self.template.write_text('<link href="/site.css" rel="stylesheet">{{ Content }}')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_check(self):
+        graph = LinkGraph(self.public, self.static)
+        graph.add_template(self.template)
+        graph.add(self.public / "index.html", { "links": ["/blog/", "/images/logo.png", "https://example.com", "#top"] })
+        graph.add(self.public / "blog" / "index.html", { "links": ["../index.html", "post.html", "/missing.html#part"] })
+        report = graph.check()
+
+        self.assertEqual(report.broken, { "/blog/index.html": ["/blog/post.html", "/missing.html"] })
+        self.assertEqual(report.orphans, ["/images/old.png", "/images/unused-bg.png", "/unused.css"])
+        self.assertEqual(report.lines()[0], "Broken link in `/blog/index.html`: `/blog/post.html`")
+
+    def test_reachable_assets(self):
+        content = self.root / "content"
+        (content / "blog").mkdir(parents=True)
+        (content / "index.md").write_text("# Home\n\n![logo](/images/logo.png) and [a post](blog/post.html)")
+        (content / "blog" / "post.md").write_text("---\ntags: [a]\n---\n# Post\n\n[back](../index.html)")
+        reachable = reachable_assets(content, self.static, self.template)
+        self.assertEqual(reachable, { self.static / "site.css", self.static / "images" / "bg.png", self.static / "images" / "logo.png" })
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+from contextlib import redirect_stderr
+import io
+import os
+import unittest
+import tempfile
+from pathlib import Path
+
+import main
+from main import collect_page_jobs, generate_page, generate_pages_parallel, generate_pages_recursive
+from assets import AssetPipeline
+from image_size import configure_image_markup
+from manifest import BuildManifest
+from output_writer import OutputWriter
+from site_outputs import SiteOutputs
+from test_image_size import png
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / "content"
+        (self.content / "nested").mkdir(parents=True)
+        (self.content / "index.md").write_text("# Home\n\nSome **bold** text")
+        (self.content / "nested" / "page.md").write_text("# Nested\n\n* a\n* b")
+        self.template = self.root / "template.html"
+        self.template.write_text("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_collect_jobs(self):
+        jobs = collect_page_jobs(self.content, self.root / "public")
+        expected = {
+            (self.content / "index.md", self.root / "public" / "index.html"),
+            (self.content / "nested" / "page.md", self.root / "public" / "nested" / "page.html"),
+        }
+        self.assertEqual(set(jobs), expected)
+
+    def test_matches_serial(self):
+        generate_pages_recursive(self.content, self.template, self.root / "serial")
+        jobs = collect_page_jobs(self.content, self.root / "parallel")
+        errors = generate_pages_parallel(jobs, self.template, 2)
+        self.assertEqual(errors, {})
+        for page in ["index.html", "nested/page.html"]:
+            self.assertEqual((self.root / "serial" / page).read_bytes(), (self.root / "parallel" / page).read_bytes())
+
+    def test_reports_page_errors(self):
+        (self.content / "broken.md").write_text("no title here")
+        jobs = collect_page_jobs(self.content, self.root / "public")
+        errors = generate_pages_parallel(jobs, self.template, 2)
+        self.assertEqual(list(errors), [self.content / "broken.md"])
+        self.assertIsInstance(errors[self.content / "broken.md"], ValueError)
+
+class TestSiteOutputs(unittest.TestCase):
+    def test_incremental_build_reuses_summaries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            content = root / "content"
+            content.mkdir()
+            (content / "index.md").write_text("# Home\n\nWelcome")
+            (content / "post.md").write_text("# Post\n\nNews")
+            template = root / "template.html"
+            template.write_text("{{ Content }}")
+            public = root / "public"
+
+            def build():
+                manifest = BuildManifest(root / ".build-manifest.json", template)
+                outputs = SiteOutputs(public, "https://example.com")
+                generate_pages_recursive(content, template, public, manifest, collectors=[outputs])
+                outputs.close()
+                manifest.save()
+                return (public / "search-index.json").read_text()
+
+            first = build()
+            self.assertEqual(build(), first)
+            self.assertIn('"welcome"', first)
+
+class TestParseArgs(unittest.TestCase):
+    def test_watch_rejects_site_wide_options(self):
+        with redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                main.parse_args(["--watch", "--asset-pipeline", "--site-url", "https://example.com"])
+        self.assertIn("--watch cannot be combined with --asset-pipeline, --site-url", stderr.getvalue())
+        with redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                main.parse_args(["--watch", "--workers", "2"])
+        self.assertIn("--watch cannot be combined with --workers", stderr.getvalue())
+        self.assertTrue(main.parse_args(["--watch", "--block-cache", "--partial-rebuild", "--link-mode", "hardlink", "--profile"]).watch)
+
+class TestAssetReferences(unittest.TestCase):
+    def test_pages_written_once_with_hashed_names(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "content" / "blog").mkdir(parents=True)
+            (root / "content" / "blog" / "post.md").write_text("# Post\n\n![bg](../bg.png)")
+            (root / "static").mkdir()
+            (root / "static" / "bg.png").write_bytes(b"png")
+            (root / "template.html").write_text('<link href="/site.css">{{ Content }}')
+            (root / "static" / "site.css").write_text("body {}")
+            public = root / "public"
+
+            pipeline = AssetPipeline(root / "static", public)
+            mapping = pipeline.run()
+            writer = OutputWriter()
+            generate_pages_recursive(root / "content", root / "template.html", public, writer=writer, assets=pipeline.references())
+            self.assertEqual(pipeline.rewrite_html([public / "blog" / "post.html"]), [])
+            self.assertEqual(writer.written, 1)
+            html = (public / "blog" / "post.html").read_text()
+            self.assertIn(f'<link href="{mapping["/site.css"]}">', html)
+            self.assertIn(f'src="{mapping["/bg.png"]}"', html)
+
+class TestImageDimensions(unittest.TestCase):
+    def test_incremental_build_follows_option_and_images(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "content").mkdir()
+            (root / "content" / "index.md").write_text("# Home\n\n![logo](/logo.png)")
+            (root / "static").mkdir()
+            (root / "static" / "logo.png").write_bytes(png(4, 3))
+            template = root / "template.html"
+            template.write_text("{{ Content }}")
+            public = root / "public"
+
+            def build(image_dimensions):
+                configure_image_markup(root / "static" if image_dimensions else None)
+                try:
+                    manifest = BuildManifest(root / ".build-manifest.json", template, { "image_dimensions": image_dimensions })
+                    generate_pages_recursive(root / "content", template, public, manifest)
+                    manifest.save()
+                finally:
+                    configure_image_markup(None)
+                return (public / "index.html").read_text()
+
+            self.assertNotIn("width", build(False))
+            self.assertIn('width="4" height="3"', build(True))
+            (root / "static" / "logo.png").write_bytes(png(8, 6))
+            os.utime(root / "static" / "logo.png", ns=(1, 1))
+            self.assertIn('width="8" height="6"', build(True))
+            self.assertNotIn("width", build(False))
+
+class TestFrontMatter(unittest.TestCase):
+    def test_fields_reach_template(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "page.md").write_text("---\nauthor: Ann\ntags: [a, b]\n---\n# Title\n\nBody")
+            (root / "template.html").write_text("{{ Title }} by {{ author }} ({{ tags }}){{ Content }}")
+            generate_page(root / "page.md", root / "template.html", root / "page.html")
+            self.assertEqual((root / "page.html").read_text(), "Title by Ann (a, b)<div><h1>Title</h1><p>Body</p></div>")
+
+    def test_path_and_date_reach_template(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "content" / "blog").mkdir(parents=True)
+            (root / "content" / "blog" / "post.md").write_text("---\ndate: 2024-05-01\n---\n# Post")
+            (root / "template.html").write_text("{{ Path }} {{ Date }}")
+            generate_pages_recursive(root / "content", root / "template.html", root / "public")
+            self.assertEqual((root / "public" / "blog" / "post.html").read_text(), "/blog/post.html 2024-05-01T00:00:00Z")
+
+class TestStreamingPage(unittest.TestCase):
+    def test_matches_whole_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "page.md").write_text("---\ntags: [a]\n---\nIntro\n\n# Title\n\n* one\n* two\n\n```\ncode\n\nmore\n```\n\n> quote")
+            (root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+            generate_page(root / "page.md", root / "template.html", root / "whole.html")
+
+            threshold = main.STREAMING_THRESHOLD
+            main.STREAMING_THRESHOLD = 0
+            try:
+                generate_page(root / "page.md", root / "template.html", root / "streamed.html")
+            finally:
+                main.STREAMING_THRESHOLD = threshold
+
+            self.assertEqual((root / "whole.html").read_text(), (root / "streamed.html").read_text())
+            self.assertIn("<pre><code>code\n\nmore</code></pre>", (root / "streamed.html").read_text())
+
+if __name__ == "__main__":
+    unittest.main()
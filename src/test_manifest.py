@@ -0,0 +1,76 @@
+import os
+import unittest
+import tempfile
+from pathlib import Path
+
+from manifest import BuildManifest
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.template = self.root / "template.html"
+        self.template.write_text("{{ Title }} {{ Content }}")
+        self.source = self.root / "index.md"
+        self.source.write_text("# Title")
+        self.dest = self.root / "index.html"
+        self.manifest_path = self.root / "manifest.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, settings: dict | None = None, dependencies: list[Path] | None = None) -> bool:
+        manifest = BuildManifest(self.manifest_path, self.template, settings)
+        current = manifest.is_current(self.source, self.dest)
+        if not current:
+            self.dest.write_text("output")
+            manifest.record(self.source, self.dest, dependencies=dependencies)
+        manifest.save()
+        return current
+
+    def test_new_page(self):
+        self.assertFalse(self.build())
+
+    def test_unchanged_page(self):
+        self.build()
+        self.assertTrue(self.build())
+
+    def test_changed_source(self):
+        self.build()
+        self.source.write_text("# New Title")
+        self.assertFalse(self.build())
+
+    def test_changed_template(self):
+        self.build()
+        self.template.write_text("<title>{{ Title }}</title>")
+        self.assertFalse(self.build())
+
+    def test_missing_output(self):
+        self.build()
+        self.dest.unlink()
+        self.assertFalse(self.build())
+
+    def test_changed_settings(self):
+        self.build({ "option": False })
+        self.assertTrue(self.build({ "option": False }))
+        self.assertFalse(self.build({ "option": True }))
+
+    def test_changed_dependency(self):
+        image = self.root / "image.png"
+        image.write_bytes(b"one")
+        self.build(dependencies=[image])
+        self.assertTrue(self.build())
+        os.utime(image, ns=(1, 1))
+        self.assertFalse(self.build(dependencies=[image]))
+        image.unlink()
+        self.assertFalse(self.build(dependencies=[image]))
+        self.assertTrue(self.build())
+
+    def test_remove_stale(self):
+        self.build()
+        manifest = BuildManifest(self.manifest_path, self.template)
+        self.assertEqual(manifest.remove_stale(), [str(self.dest)])
+        self.assertFalse(self.dest.exists())
+
+if __name__ == "__main__":
+    unittest.main()
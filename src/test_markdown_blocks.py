@@ -1,5 +1,5 @@
 import unittest
-from markdown_blocks import markdown_to_blocks, extract_title
+from markdown_blocks import markdown_to_blocks, extract_title, iter_blocks, find_title, classify_block, scan_blocks, Block, BlockType
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_blocks(self):
@@ -14,6 +14,36 @@ This is a paragraph of text. It has some **bold** and *italic* words inside of i
 """
         self.assertEqual(markdown_to_blocks(markdown), ['# This is a heading', 'This is a paragraph of text. It has some **bold** and *italic* words inside of it.', '* This is the first list item in a list block\n* This is a list item\n* This is another list item'])
 
+    def test_code_fence_with_blank_lines(self):
+        markdown = "Before\n\n```\nline one\n\nline two\n```\n\nAfter"
+        self.assertEqual(markdown_to_blocks(markdown), ['Before', '```\nline one\n\nline two\n```', 'After'])
+
+    def test_single_line_code_fence(self):
+        markdown = "```inline```\n\nAfter"
+        self.assertEqual(markdown_to_blocks(markdown), ['```inline```', 'After'])
+
+    def test_no_empty_blocks(self):
+        self.assertEqual(markdown_to_blocks("a\n\n\n\n\nb\n\n"), ['a', 'b'])
+
+class TestIterBlocks(unittest.TestCase):
+    def test_lines_with_newlines(self):
+        lines = ["# Title\n", "\n", "first line\n", "second line\n"]
+        self.assertEqual(list(iter_blocks(lines)), ['# Title', 'first line\nsecond line'])
+
+    def test_lazy(self):
+        def lines():
+            yield "# Title"
+            yield ""
+            raise AssertionError("read past the first block")
+        self.assertEqual(next(iter_blocks(lines())), '# Title')
+
+class TestFindTitle(unittest.TestCase):
+    def test_first_h1(self):
+        self.assertEqual(find_title(["## Sub", "text", "# Title", "# Other"]), "Title")
+
+    def test_none(self):
+        self.assertIsNone(find_title(["## Sub", "text"]))
+
 class TestExtractTitle(unittest.TestCase):
     def test_single_heading(self):
         markdown = "# Title"
@@ -23,5 +53,44 @@ class TestExtractTitle(unittest.TestCase):
         markdown = "# Title\n\ncontent\n\n## Subtitle"
         self.assertEqual(extract_title(markdown), "Title")
 
+    def test_h1_after_subheading(self):
+        markdown = "## Subtitle\n\n# Title"
+        self.assertEqual(extract_title(markdown), "Title")
+
+    def test_no_title(self):
+        with self.assertRaises(ValueError):
+            extract_title("## Subtitle\n\ncontent")
+
+class TestClassifyBlock(unittest.TestCase):
+    def test_heading_level(self):
+        self.assertEqual(classify_block("### Heading"), Block("### Heading", BlockType.HEADING, 3))
+
+    def test_too_many_hashes(self):
+        self.assertEqual(classify_block("####### Heading").block_type, BlockType.PARAGRAPH)
+
+    def test_code_fence_must_close_line(self):
+        self.assertEqual(classify_block("```\ncode\n```").block_type, BlockType.CODE)
+        self.assertEqual(classify_block("```\ncode\n``` trailing").block_type, BlockType.PARAGRAPH)
+
+    def test_list_items(self):
+        self.assertEqual(classify_block("* a\n* b").items, ["a", "b"])
+        self.assertEqual(classify_block("1. a\n10. b").items, ["a", "b"])
+        self.assertIsNone(classify_block("> a\n> b").items)
+
+    def test_mixed_lines(self):
+        self.assertEqual(classify_block("* item\n1. item").block_type, BlockType.PARAGRAPH)
+        self.assertEqual(classify_block("> quote\n* item").block_type, BlockType.PARAGRAPH)
+
+class TestScanBlocks(unittest.TestCase):
+    def test_blocks_and_title(self):
+        (blocks, title) = scan_blocks("## Intro\n\n# Title\n\n* a\n* b")
+        self.assertEqual(title, "Title")
+        self.assertEqual([block.block_type for block in blocks], [BlockType.HEADING, BlockType.HEADING, BlockType.UNORDERED_LIST])
+        self.assertEqual([block.level for block in blocks], [2, 1, None])
+
+    def test_no_title(self):
+        (_, title) = scan_blocks("text only")
+        self.assertIsNone(title)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from metadata_index import MetadataIndex
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / "content"
+        (self.content / "blog").mkdir(parents=True)
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "blog" / "post.md").write_text("---\ntags: [python, web]\n---\n# First post\n\nBody")
+        (self.content / "blog" / "notes.md").write_text("---\ntitle: Notes\ntags: web\n---\nNo heading here")
+        self.index_path = self.root / ".cache" / "metadata-index.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan(self):
+        index = MetadataIndex()
+        index.scan(self.content)
+        self.assertEqual(
+            [ (entry["url"], entry["title"]) for entry in index.pages() ],
+            [("/blog/notes.html", "Notes"), ("/blog/post.html", "First post"), ("/index.html", "Home")]
+        )
+        self.assertEqual(index.entries["blog/post.md"]["metadata"], { "tags": ["python", "web"] })
+
+    def test_group_by(self):
+        index = MetadataIndex()
+        index.scan(self.content)
+        groups = index.group_by("tags")
+        self.assertEqual(sorted(groups), ["python", "web"])
+        self.assertEqual([ entry["url"] for entry in groups["web"] ], ["/blog/notes.html", "/blog/post.html"])
+
+    def test_reuses_unchanged_entries(self):
+        index = MetadataIndex(self.index_path)
+        index.scan(self.content)
+        index.save()
+
+        post = self.content / "blog" / "post.md"
+        post.write_text("---\ntags: [python]\n---\n# Renamed post")
+        os.utime(post, ns=(1, 1))
+        (self.content / "index.md").unlink()
+
+        index = MetadataIndex(self.index_path)
+        index.scan(self.content)
+        self.assertEqual((index.scanned, index.reused), (1, 1))
+        self.assertEqual(sorted(index.entries), ["blog/notes.md", "blog/post.md"])
+        self.assertEqual(index.entries["blog/post.md"]["title"], "Renamed post")
+
+    def test_reads_only_leading_headings(self):
+        (self.content / "late.md").write_text("## Kicker\n\n# Late title\n\nBody")
+        (self.content / "after.md").write_text("Intro\n\n# After intro")
+        index = MetadataIndex()
+        index.scan(self.content)
+        self.assertEqual(index.entries["late.md"]["title"], "Late title")
+        self.assertIsNone(index.entries["after.md"]["title"])
+
+    def test_records_errors(self):
+        (self.content / "broken.md").write_text("---\nnot a field\n---\n# Broken")
+        index = MetadataIndex()
+        index.scan(self.content)
+        self.assertEqual(list(index.errors()), ["broken.md"])
+        self.assertIn("not a `key: value` pair", index.errors()["broken.md"])
+        self.assertNotIn("/broken.html", [ entry["url"] for entry in index.pages() ])
+
+if __name__ == "__main__":
+    unittest.main()
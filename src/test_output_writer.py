@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from output_writer import OutputWriter, output_mode
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writes_and_makes_directories(self):
+        writer = OutputWriter()
+        with writer.open(self.root / "a" / "b" / "page.html") as f:
+            f.write("<p>hi</p>")
+        self.assertEqual((self.root / "a" / "b" / "page.html").read_text(), "<p>hi</p>")
+        self.assertIn(self.root / "a", writer.directories)
+        self.assertEqual(writer.written, 1)
+
+    def test_unchanged_output_keeps_mtime(self):
+        page = self.root / "page.html"
+        page.write_text("<p>hi</p>")
+        os.utime(page, ns=(1, 1))
+
+        writer = OutputWriter()
+        with writer.open(page) as f:
+            f.write("<p>hi</p>")
+        self.assertEqual(page.stat().st_mtime_ns, 1)
+        self.assertFalse(writer.write_bytes(page, b"<p>hi</p>"))
+        self.assertEqual((writer.written, writer.unchanged), (0, 2))
+
+        self.assertTrue(writer.write_bytes(page, b"<p>bye</p>"))
+        self.assertNotEqual(page.stat().st_mtime_ns, 1)
+
+    def test_failed_write_leaves_original(self):
+        page = self.root / "page.html"
+        page.write_text("original")
+        with self.assertRaises(RuntimeError):
+            with OutputWriter().open(page) as f:
+                f.write("partial")
+                raise RuntimeError("render failed")
+        self.assertEqual(page.read_text(), "original")
+        self.assertEqual(os.listdir(self.root), ["page.html"])
+
+    def test_failure_after_commit_keeps_error(self):
+        page = self.root / "page.html"
+        writer = OutputWriter()
+        commit = writer.commit
+        def commit_then_fail(temp_path, path):
+            commit(temp_path, path)
+            raise RuntimeError("after replace")
+
+        with mock.patch.object(writer, "commit", side_effect=commit_then_fail):
+            with self.assertRaisesRegex(RuntimeError, "after replace"):
+                with writer.open(page) as f:
+                    f.write("done")
+        self.assertEqual(os.listdir(self.root), ["page.html"])
+
+    def test_output_mode_matches_umask(self):
+        umask = os.umask(0o027)
+        try:
+            output_mode.cache_clear()
+            self.assertEqual(output_mode(), 0o640)
+            self.assertEqual(os.umask(0o027), 0o027)
+        finally:
+            os.umask(umask)
+            output_mode.cache_clear()
+
+    def test_make_dirs_once(self):
+        writer = OutputWriter()
+        writer.make_dirs([self.root / "x" / "y", self.root / "x"])
+        (self.root / "x" / "y").rmdir()
+        # Known directories are not checked again
+        writer.make_dirs([self.root / "x" / "y"])
+        self.assertFalse((self.root / "x" / "y").exists())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import tempfile
+from pathlib import Path
+
+from converters.html_converters import markdown_to_html_node
+from page_fragments import FragmentStore, PageFragments
+
+MARKDOWN = "# Title\n\nFirst **paragraph**\n\n* one\n* two\n\nLast paragraph"
+
+class TestPageFragments(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name, "page.fragments")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, markdown, version="1"):
+        fragments = PageFragments(self.path, version)
+        html = markdown_to_html_node(markdown, fragments).to_html()
+        return (html, fragments)
+
+    def test_matches_clean_build_after_edit(self):
+        self.render(MARKDOWN)
+        edited = MARKDOWN.replace("First **paragraph**", "First *edited* paragraph")
+        (html, fragments) = self.render(edited)
+        self.assertEqual(html, markdown_to_html_node(edited).to_html())
+        self.assertEqual((fragments.hits, fragments.misses), (3, 1))
+
+    def test_reuses_moved_and_inserted_around_blocks(self):
+        self.render(MARKDOWN)
+        edited = "New first paragraph\n\n" + MARKDOWN.replace("\n\nLast paragraph", "") + "\n\nLast paragraph"
+        (html, fragments) = self.render(edited)
+        self.assertEqual(html, markdown_to_html_node(edited).to_html())
+        self.assertEqual((fragments.hits, fragments.misses), (4, 1))
+
+        (_, fragments) = self.render(edited)
+        self.assertEqual((fragments.hits, fragments.misses), (5, 0))
+
+    def test_unchanged_page_keeps_record(self):
+        self.render(MARKDOWN)
+        mtime = os.stat(self.path).st_mtime_ns
+        (_, fragments) = self.render(MARKDOWN)
+        self.assertEqual((fragments.hits, fragments.misses), (4, 0))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+        self.assertEqual([name for name in os.listdir(self.tmp.name)], ["page.fragments"])
+
+    def test_removed_blocks_are_dropped(self):
+        self.render(MARKDOWN)
+        (_, fragments) = self.render("# Title")
+        self.assertEqual(fragments.new_keys, fragments.old_keys[:1])
+        (_, fragments) = self.render("# Title")
+        self.assertEqual(len(fragments.offsets), 1)
+
+    def test_version_change_ignores_record(self):
+        self.render(MARKDOWN)
+        (_, fragments) = self.render(MARKDOWN, version="2")
+        self.assertEqual((fragments.hits, fragments.misses), (0, 4))
+
+    def test_uncommitted_record_is_discarded(self):
+        fragments = PageFragments(self.path, "1")
+        fragments.put("block", "<p>block</p>")
+        fragments.close()
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_store_keeps_pages_apart(self):
+        store = FragmentStore(self.tmp.name, version="1")
+        self.assertNotEqual(store.page("a.md").path, store.page("b.md").path)
+        self.assertEqual(store.page("a.md").path, store.page("./a.md").path)
+
+if __name__ == "__main__":
+    unittest.main()
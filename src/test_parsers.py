@@ -1,5 +1,5 @@
 import unittest
-from parsers import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes
+from parsers import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, split_text_to_textnodes, text_to_textnodes
 from textnode import TextNode, TextType
 
 class TestExtractMarkdownImages(unittest.TestCase):
@@ -137,6 +137,18 @@ class TestSplitNodesLink(unittest.TestCase):
         ]
         self.assertEqual(actual, expected)
 
+    def test_repeated_link(self):
+        nodes = [TextNode("[a](x.com) then [a](x.com), ![a](x.com) and [a](x.com)", TextType.TEXT)]
+        actual = split_nodes_link(nodes)
+        expected = [
+            TextNode("a", TextType.LINK, "x.com"),
+            TextNode(" then ", TextType.TEXT),
+            TextNode("a", TextType.LINK, "x.com"),
+            TextNode(", ![a](x.com) and ", TextType.TEXT),
+            TextNode("a", TextType.LINK, "x.com")
+        ]
+        self.assertEqual(actual, expected)
+
 class TestTextToTextNodes(unittest.TestCase):
     def test_all_types(self):
         actual = text_to_textnodes("This is **text** with an *italic* word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)")
@@ -156,5 +168,51 @@ class TestTextToTextNodes(unittest.TestCase):
             ]
         )
 
+    def test_leading_element(self):
+        actual = text_to_textnodes("**bold** then [link](a.com)")
+        expected = [
+            TextNode("bold", TextType.BOLD),
+            TextNode(" then ", TextType.TEXT),
+            TextNode("link", TextType.LINK, "a.com"),
+        ]
+        self.assertEqual(actual, expected)
+
+    def test_code_containing_asterisks(self):
+        # The italic pass runs before the code pass, so asterisks inside code spans still count
+        with self.assertRaises(Exception):
+            text_to_textnodes("multiply with `a * b`")
+        with self.assertRaises(Exception):
+            text_to_textnodes("`a *b* c`")
+
+    def test_delimiters_inside_link(self):
+        actual = text_to_textnodes("[a *b* c](u)")
+        expected = [TextNode("[a ", TextType.TEXT), TextNode("b", TextType.ITALIC), TextNode(" c](u)", TextType.TEXT)]
+        self.assertEqual(actual, expected)
+
+    def test_image_inside_link_text(self):
+        actual = text_to_textnodes("[!![a](u) b")
+        expected = [TextNode("[!", TextType.TEXT), TextNode("a", TextType.IMAGE, "u"), TextNode(" b", TextType.TEXT)]
+        self.assertEqual(actual, expected)
+
+    def test_bold_inside_italic(self):
+        with self.assertRaises(Exception):
+            text_to_textnodes("*a **b** c*")
+
+    def test_matches_split_passes(self):
+        for text in ["**a*b*c**", "*a***b**", "`x` **y `z** w", "![a *b*](u) [c](d*e*)", "**a** *b* `c` ![d](e) [f](g)"]:
+            try:
+                expected = split_text_to_textnodes(text)
+            except Exception:
+                with self.assertRaises(Exception):
+                    text_to_textnodes(text)
+                continue
+            self.assertEqual(text_to_textnodes(text), expected)
+
+    def test_unclosed_delimiter(self):
+        with self.assertRaises(Exception):
+            text_to_textnodes("this **never closes")
+        with self.assertRaises(Exception):
+            text_to_textnodes("this `never closes")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
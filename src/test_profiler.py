@@ -0,0 +1,60 @@
+import unittest
+
+from profiler import BuildProfiler, profiled, profiler
+
+@profiled("doubling", count=lambda result: { "doubled": result })
+def double(value: int) -> int:
+    return value * 2
+
+@profiled("doubling")
+def quadruple(value: int) -> int:
+    return double(double(value))
+
+class TestProfiled(unittest.TestCase):
+    def setUp(self):
+        profiler.reset()
+
+    def tearDown(self):
+        profiler.enabled = False
+        profiler.reset()
+
+    def test_disabled(self):
+        self.assertEqual(double(2), 4)
+        self.assertEqual(dict(profiler.calls), {})
+
+    def test_enabled(self):
+        profiler.enabled = True
+        double(2)
+        double(3)
+        self.assertEqual(profiler.calls["doubling"], 2)
+        self.assertEqual(profiler.counters["doubled"], 10)
+
+    def test_nested_stage_counted_once(self):
+        profiler.enabled = True
+        quadruple(1)
+        self.assertEqual(profiler.calls["doubling"], 1)
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_pages_and_stages(self):
+        build = BuildProfiler()
+        build.enabled = True
+        with build.page("a.md"):
+            with build.stage("file_io"):
+                pass
+        with build.page("b.md"):
+            pass
+        data = build.to_dict()
+        self.assertEqual(data["stages"]["file_io"]["calls"], 1)
+        self.assertEqual(data["counters"]["pages"], 2)
+        self.assertEqual({ page["path"] for page in data["slowest_pages"] }, { "a.md", "b.md" })
+        self.assertIn("file_io", build.report())
+
+    def test_disabled_records_nothing(self):
+        build = BuildProfiler()
+        with build.page("a.md"):
+            with build.stage("file_io"):
+                pass
+        self.assertEqual(build.to_dict(), { "stages": {}, "counters": {}, "slowest_pages": [] })
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from server import DevServer, RenderCache
+
+class TestRenderCache(unittest.TestCase):
+    def test_version_invalidates(self):
+        cache = RenderCache()
+        cache.put(Path("a.md"), (1, 1), b"old")
+        self.assertEqual(cache.get(Path("a.md"), (1, 1)), b"old")
+        self.assertIsNone(cache.get(Path("a.md"), (2, 1)))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = RenderCache(2)
+        cache.put(Path("a.md"), (1,), b"a")
+        cache.put(Path("b.md"), (1,), b"b")
+        cache.get(Path("a.md"), (1,))
+        cache.put(Path("c.md"), (1,), b"c")
+        self.assertEqual(list(cache.entries), [Path("a.md"), Path("c.md")])
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        content = root / "content"
+        static = root / "static"
+        (content / "blog").mkdir(parents=True)
+        static.mkdir()
+        (content / "index.md").write_text("# Home")
+        (content / "blog" / "index.md").write_text("# Blog")
+        (static / "index.css").write_text("body {}")
+        template = root / "template.html"
+        template.write_text("<title>{{ Title }}</title>{{ Content }}")
+        self.server = DevServer(content, static, template)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_page(self):
+        (status, headers, body) = self.server.respond("GET", "/", {})
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b"<title>Home</title><div><h1>Home</h1></div>")
+        self.assertEqual(headers["Content-Type"], "text/html; charset=utf-8")
+
+    def test_nested_page(self):
+        for target in ["/blog", "/blog/", "/blog/index.html"]:
+            (status, _, body) = self.server.respond("GET", target, {})
+            self.assertEqual(status, 200)
+            self.assertIn(b"<h1>Blog</h1>", body)
+
+    def test_page_cached(self):
+        self.server.respond("GET", "/", {})
+        self.server.respond("GET", "/", {})
+        self.assertEqual(self.server.cache.hits, 1)
+
+    def test_static_file(self):
+        (status, headers, body) = self.server.respond("GET", "/index.css", {})
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b"body {}")
+        self.assertEqual(headers["Content-Type"], "text/css")
+
+    def test_etag_not_modified(self):
+        (_, headers, _) = self.server.respond("GET", "/index.css", {})
+        (status, _, body) = self.server.respond("GET", "/index.css", { "if-none-match": headers["ETag"] })
+        self.assertEqual((status, body), (304, b""))
+
+    def test_last_modified_not_modified(self):
+        (_, headers, _) = self.server.respond("GET", "/index.css", {})
+        (status, _, _) = self.server.respond("GET", "/index.css", { "if-modified-since": headers["Last-Modified"] })
+        self.assertEqual(status, 304)
+
+    def test_not_found(self):
+        self.assertEqual(self.server.respond("GET", "/missing", {})[0], 404)
+        self.assertEqual(self.server.respond("GET", "/../template.html", {})[0], 404)
+
+    def test_method_not_allowed(self):
+        self.assertEqual(self.server.respond("POST", "/", {})[0], 405)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+
+from htmlnode import LeafNode, ParentNode
+from site_outputs import PageText, SiteOutputs, TextTap, page_date
+
+class TestPageText(unittest.TestCase):
+    def test_chunks_split_anywhere(self):
+        html = "<div><h1>Hello World</h1><p>Some <b>bold</b> text, <a href=\"/x\">linked</a>.</p></div>"
+        whole = PageText()
+        whole.feed(html)
+        split = PageText()
+        for i in range(0, len(html), 3):
+            split.feed(html[i:i + 3])
+        self.assertEqual(whole.summary(), "Hello World Some bold text, linked.")
+        self.assertEqual(split.summary(), whole.summary())
+        self.assertEqual(split.terms, { "hello", "world", "some", "bold", "text", "linked" })
+
+    def test_summary_is_truncated(self):
+        text = PageText(summary_length=12)
+        text.feed("<p>" + "word " * 20 + "</p>")
+        self.assertEqual(text.summary(), "word word…")
+
+    def test_tap_passes_html_through(self):
+        node = ParentNode("p", [LeafNode(None, "plain "), LeafNode("i", "words")])
+        text = PageText()
+        self.assertEqual(TextTap(node, text).to_html(), "<p>plain <i>words</i></p>")
+        self.assertEqual(text.terms, { "plain", "words" })
+
+class TestPageDate(unittest.TestCase):
+    def test_front_matter_date(self):
+        self.assertEqual(page_date({ "date": "2024-01-02" }, __file__), "2024-01-02T00:00:00Z")
+
+    def test_falls_back_to_mtime(self):
+        self.assertRegex(page_date({ "date": "soon" }, __file__), r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ$")
+
+class TestSiteOutputs(unittest.TestCase):
+    def test_writes_outputs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            public = Path(tmp)
+            outputs = SiteOutputs(public, "https://example.com/", feed_size=1)
+            outputs.add(public / "index.html", { "title": "Home", "date": "2024-01-01T00:00:00Z", "summary": "Welcome", "terms": ["home", "welcome"] })
+            outputs.add(public / "blog" / "post.html", { "title": "A & B", "date": "2024-02-01T00:00:00Z", "summary": "News", "terms": ["news", "welcome"] })
+            outputs.close()
+
+            sitemap = ElementTree.parse(public / "sitemap.xml").getroot()
+            self.assertEqual(
+                [ loc.text for loc in sitemap.iter("{http://www.sitemaps.org/schemas/sitemap/0.9}loc") ],
+                ["https://example.com/", "https://example.com/blog/post.html"]
+            )
+
+            feed = ElementTree.parse(public / "feed.xml").getroot()
+            atom = "{http://www.w3.org/2005/Atom}"
+            self.assertEqual(feed.find(f"{atom}title").text, "Home")
+            self.assertEqual([ entry.find(f"{atom}title").text for entry in feed.iter(f"{atom}entry") ], ["A & B"])
+
+            index = json.loads((public / "search-index.json").read_text())
+            self.assertEqual(index["pages"], [["/", "Home"], ["/blog/post.html", "A & B"]])
+            # Postings are delta-encoded page numbers
+            self.assertEqual(index["terms"]["welcome"], [0, 1])
+            self.assertEqual(index["terms"]["news"], [1])
+
+    def test_page_url(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            public = Path(tmp)
+            outputs = SiteOutputs(public, "https://example.com/")
+            self.assertEqual(outputs.page_url(public / "index.html"), "/")
+            self.assertEqual(outputs.page_url(public / "blog" / "index.html"), "/blog/")
+            self.assertEqual(outputs.page_url(public / "siteindex.html"), "/siteindex.html")
+            outputs.close()
+
+if __name__ == "__main__":
+    unittest.main()
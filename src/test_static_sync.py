@@ -0,0 +1,92 @@
+import unittest
+import os
+import tempfile
+from pathlib import Path
+
+from main import copy_directory_contents
+from static_sync import sync_directory_contents
+
+class TestSyncDirectoryContents(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.src = self.root / "static"
+        self.dest = self.root / "public"
+        (self.src / "images").mkdir(parents=True)
+        (self.src / "index.css").write_text("body {}")
+        (self.src / "images" / "logo.png").write_bytes(b"png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_initial_copy(self):
+        report = sync_directory_contents(self.src, self.dest)
+        self.assertEqual(len(report.copied), 2)
+        self.assertEqual((self.dest / "images" / "logo.png").read_bytes(), b"png")
+
+    def test_unchanged_files_skipped(self):
+        sync_directory_contents(self.src, self.dest)
+        report = sync_directory_contents(self.src, self.dest)
+        self.assertEqual(report.copied, [])
+        self.assertEqual(len(report.unchanged), 2)
+
+    def test_changed_file_copied(self):
+        sync_directory_contents(self.src, self.dest)
+        (self.src / "index.css").write_text("body { margin: 0; }")
+        report = sync_directory_contents(self.src, self.dest)
+        self.assertEqual(report.copied, [self.dest / "index.css"])
+        self.assertEqual((self.dest / "index.css").read_text(), "body { margin: 0; }")
+
+    def test_checksum_detects_same_size_change(self):
+        sync_directory_contents(self.src, self.dest)
+        stat = (self.src / "index.css").stat()
+        (self.src / "index.css").write_text("body ()")
+        os.utime(self.src / "index.css", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        report = sync_directory_contents(self.src, self.dest, checksum=True)
+        self.assertEqual(report.copied, [self.dest / "index.css"])
+
+    def test_removed_source_deleted(self):
+        sync_directory_contents(self.src, self.dest)
+        (self.src / "images" / "logo.png").unlink()
+        (self.src / "images").rmdir()
+        report = sync_directory_contents(self.src, self.dest)
+        self.assertEqual(report.removed, [self.dest / "images" / "logo.png"])
+        self.assertFalse((self.dest / "images").exists())
+
+    def test_include_only_listed_files(self):
+        sync_directory_contents(self.src, self.dest)
+        report = sync_directory_contents(self.src, self.dest, include={ self.src / "index.css" })
+        self.assertEqual(report.removed, [self.dest / "images" / "logo.png"])
+        self.assertTrue((self.dest / "index.css").exists())
+        self.assertFalse((self.dest / "images").exists())
+
+    def test_keep_generated_pages(self):
+        sync_directory_contents(self.src, self.dest)
+        page = self.dest / "blog" / "index.html"
+        page.parent.mkdir()
+        page.write_text("<html></html>")
+        sync_directory_contents(self.src, self.dest, keep={page})
+        self.assertTrue(page.exists())
+
+    def test_hardlink(self):
+        sync_directory_contents(self.src, self.dest, link_mode="hardlink")
+        self.assertTrue(os.path.samefile(self.src / "index.css", self.dest / "index.css"))
+
+    def test_copy_over_hardlinked_sync(self):
+        # An incremental build copies static files over the output a hard linking sync left behind
+        sync_directory_contents(self.src, self.dest, link_mode="hardlink")
+        copy_directory_contents(self.src, self.dest, clear=False)
+        self.assertFalse(os.path.samefile(self.src / "index.css", self.dest / "index.css"))
+        (self.dest / "index.css").write_text("changed")
+        self.assertEqual((self.src / "index.css").read_text(), "body {}")
+
+    def test_copy_file_range(self):
+        sync_directory_contents(self.src, self.dest, link_mode="copy_file_range")
+        self.assertEqual((self.dest / "index.css").read_text(), "body {}")
+
+    def test_unknown_link_mode(self):
+        with self.assertRaises(ValueError):
+            sync_directory_contents(self.src, self.dest, link_mode="symlink")
+
+if __name__ == "__main__":
+    unittest.main()
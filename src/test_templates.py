@@ -0,0 +1,52 @@
+import unittest
+import io
+import os
+import tempfile
+from pathlib import Path
+
+from htmlnode import LeafNode, ParentNode
+from templates import load_template, parse_template
+
+class TestParseTemplate(unittest.TestCase):
+    def test_segments_and_slots(self):
+        template = parse_template("<title>{{ Title }}</title><p>{{Content}}</p>")
+        self.assertEqual(template.segments, ["<title>", "</title><p>", "</p>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_no_slots(self):
+        template = parse_template("<p>static</p>")
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+    def test_render(self):
+        template = parse_template("{{ Title }} - {{ Date }} - {{ Title }}")
+        self.assertEqual(template.render({ "Title": "Home", "Date": "2024-01-01" }), "Home - 2024-01-01 - Home")
+
+    def test_missing_value(self):
+        template = parse_template("<p>{{ Missing }}</p>")
+        self.assertEqual(template.render({}), "<p></p>")
+
+    def test_write_html_node(self):
+        template = parse_template("<article>{{ Content }}</article>")
+        content = ParentNode("div", [LeafNode("p", "text")])
+        stream = io.StringIO()
+        template.write(stream, { "Content": content })
+        self.assertEqual(stream.getvalue(), "<article><div><p>text</p></div></article>")
+        self.assertEqual(template.render({ "Content": content }), stream.getvalue())
+
+class TestLoadTemplate(unittest.TestCase):
+    def test_cached_until_modified(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "template.html"
+            path.write_text("{{ Title }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+
+            path.write_text("<h1>{{ Title }}</h1>")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            second = load_template(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.render({ "Title": "Home" }), "<h1>Home</h1>")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,6 +18,15 @@ class TestTextNode(unittest.TestCase):
         node =TextNode("This node has no url", TextType.BOLD)
         self.assertIsNone(node.url) 
 
+    def test_repr(self):
+        node = TextNode("link", TextType.LINK, "a.com")
+        self.assertEqual(repr(node), "TextNode(link, 5, a.com)")
+
+    def test_no_instance_dict(self):
+        node = TextNode("text", TextType.TEXT)
+        with self.assertRaises(AttributeError):
+            node.__dict__
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
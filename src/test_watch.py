@@ -0,0 +1,119 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from image_size import configure_image_markup
+from test_image_size import png
+from watch import DependencyGraph, SiteWatcher, scan_tree
+
+class TestDependencyGraph(unittest.TestCase):
+    def test_affected(self):
+        graph = DependencyGraph()
+        graph.add(Path("a.html"), [Path("a.md"), Path("template.html")])
+        graph.add(Path("b.html"), [Path("b.md"), Path("template.html")])
+        self.assertEqual(graph.affected({Path("a.md")}), {Path("a.html")})
+        self.assertEqual(graph.affected({Path("template.html")}), {Path("a.html"), Path("b.html")})
+
+    def test_remove(self):
+        graph = DependencyGraph()
+        graph.add(Path("a.html"), [Path("a.md")])
+        graph.remove(Path("a.html"))
+        self.assertEqual(graph.affected({Path("a.md")}), set())
+        self.assertEqual(graph.dependents, {})
+
+class TestSiteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.root = root
+        self.content = root / "content"
+        self.static = root / "static"
+        self.public = root / "public"
+        self.template = root / "template.html"
+        (self.content / "blog").mkdir(parents=True)
+        self.static.mkdir()
+        (self.content / "index.md").write_text("# Home")
+        (self.content / "blog" / "post.md").write_text("# Post")
+        (self.static / "index.css").write_text("body {}")
+        self.template.write_text("<title>{{ Title }}</title>{{ Content }}")
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.public)
+        self.watcher.build()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_build(self):
+        self.assertEqual((self.public / "index.html").read_text(), "<title>Home</title><div><h1>Home</h1></div>")
+        self.assertTrue((self.public / "blog" / "post.html").exists())
+        self.assertTrue((self.public / "index.css").exists())
+
+    def test_page_edit_rebuilds_one_page(self):
+        (self.content / "index.md").write_text("# New Home")
+        touched = self.watcher.rebuild({self.content / "index.md"}, set())
+        self.assertEqual(touched, {self.public / "index.html"})
+        self.assertIn("New Home", (self.public / "index.html").read_text())
+
+    def test_template_edit_rebuilds_all_pages(self):
+        touched = self.watcher.rebuild({self.template}, set())
+        self.assertEqual(touched, {self.public / "index.html", self.public / "blog" / "post.html"})
+
+    def test_image_edit_rebuilds_pages_showing_it(self):
+        (self.static / "logo.png").write_bytes(png(4, 3))
+        (self.content / "index.md").write_text("# Home\n\n![logo](/logo.png)")
+        configure_image_markup(self.static)
+        try:
+            self.watcher.build()
+            (self.static / "logo.png").write_bytes(png(8, 6))
+            touched = self.watcher.rebuild({self.static / "logo.png"}, set())
+        finally:
+            configure_image_markup(None)
+        self.assertEqual(touched, {self.public / "index.html", self.public / "logo.png"})
+        self.assertIn('width="8" height="6"', (self.public / "index.html").read_text())
+
+    def test_removed_image_rebuilds_pages_showing_it(self):
+        (self.static / "logo.png").write_bytes(png(4, 3))
+        (self.content / "index.md").write_text("# Home\n\n![logo](/logo.png)")
+        configure_image_markup(self.static)
+        try:
+            self.watcher.build()
+            (self.static / "logo.png").unlink()
+            touched = self.watcher.rebuild(set(), {self.static / "logo.png"})
+        finally:
+            configure_image_markup(None)
+        self.assertEqual(touched, {self.public / "index.html", self.public / "logo.png"})
+        self.assertFalse((self.public / "logo.png").exists())
+        self.assertNotIn("width", (self.public / "index.html").read_text())
+
+    def test_image_added_after_page_referencing_it(self):
+        (self.content / "index.md").write_text("# Home\n\n![logo](/logo.png)")
+        configure_image_markup(self.static)
+        try:
+            self.watcher.build()
+            (self.static / "logo.png").write_bytes(png(4, 3))
+            touched = self.watcher.rebuild({self.static / "logo.png"}, set())
+        finally:
+            configure_image_markup(None)
+        self.assertEqual(touched, {self.public / "index.html", self.public / "logo.png"})
+        self.assertTrue((self.public / "logo.png").exists())
+        self.assertIn('width="4" height="3"', (self.public / "index.html").read_text())
+
+    def test_files_vanishing_during_scan(self):
+        self.template.unlink()
+        self.assertNotIn(self.template, self.watcher.snapshot())
+        self.assertEqual(scan_tree(self.root / "missing"), {})
+
+    def test_new_asset(self):
+        (self.static / "logo.png").write_bytes(b"png")
+        touched = self.watcher.rebuild({self.static / "logo.png"}, set())
+        self.assertEqual(touched, {self.public / "logo.png"})
+        self.assertEqual((self.public / "logo.png").read_bytes(), b"png")
+
+    def test_removed_page(self):
+        (self.content / "blog" / "post.md").unlink()
+        (changed, removed) = self.watcher.changed_inputs()
+        self.assertEqual(removed, {self.content / "blog" / "post.md"})
+        self.watcher.rebuild(changed, removed)
+        self.assertFalse((self.public / "blog" / "post.html").exists())
+
+if __name__ == "__main__":
+    unittest.main()
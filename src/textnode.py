@@ -4,6 +4,9 @@ from typing import Self
 TextType = Enum('TextType', ['TEXT', 'BOLD', 'ITALIC', 'CODE', 'LINK', 'IMAGE'])
 
 class TextNode():
+    # Nodes are created for every inline span of every page, so skip the per-instance `__dict__`
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str | None = None) -> None:
         self.text = text
         self.text_type = text_type
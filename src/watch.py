@@ -0,0 +1,211 @@
+from pathlib import Path
+import os
+import time
+
+from block_cache import BlockCache
+from main import generate_page, image_dependencies
+from page_fragments import FragmentStore
+from profiler import profiler
+from static_sync import copy_file, sync_directory_contents
+
+def scan_tree(root: Path) -> dict[Path, int]:
+    """
+        Map every file under `root` to its modification time
+
+        Files and directories that disappear during the scan, as editors that save by renaming make them do,
+        are left out, so they count as removed until they reappear.
+    """
+    mtimes = {}
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        mtimes.update(scan_tree(Path(entry.path)))
+                    else:
+                        mtimes[Path(entry.path)] = entry.stat().st_mtime_ns
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return mtimes
+
+class DependencyGraph():
+    """
+        Record of which inputs each output was built from, queried in reverse on change
+    """
+    def __init__(self) -> None:
+        self.inputs = {}
+        self.dependents = {}
+
+    def add(self, output: Path, inputs: list[Path]) -> None:
+        self.remove(output)
+        self.inputs[output] = set(inputs)
+        for path in inputs:
+            self.dependents.setdefault(path, set()).add(output)
+
+    def remove(self, output: Path) -> None:
+        for path in self.inputs.pop(output, set()):
+            outputs = self.dependents[path]
+            outputs.discard(output)
+            if len(outputs) == 0:
+                del self.dependents[path]
+
+    def affected(self, inputs: set[Path]) -> set[Path]:
+        """
+            Find every output that depends on any of `inputs`
+        """
+        outputs = set()
+        for path in inputs:
+            outputs.update(self.dependents.get(path, set()))
+        return outputs
+
+class SiteWatcher():
+    """
+        Keep `public/` up to date with `content/`, `static/` and the template by polling for changes
+
+        Only outputs that depend on a changed input are rebuilt, and everything runs in one process
+        so modules and the compiled template stay loaded between rebuilds.
+        Pages are rendered with the `block_cache` and `fragments` given, and with image dimensions enabled
+        they also depend on the images they read dimensions from. Static files are placed with `link_mode`,
+        and with `checksum` the initial sync compares them by content rather than modification time.
+    """
+    def __init__(self, content_path: Path, static_path: Path, template_path: Path, public_path: Path, block_cache: BlockCache | None = None, fragments: FragmentStore | None = None, link_mode: str = "copy", checksum: bool = False) -> None:
+        self.content_path = Path(content_path)
+        self.static_path = Path(static_path)
+        self.template_path = Path(template_path)
+        self.public_path = Path(public_path)
+        self.block_cache = block_cache
+        self.fragments = fragments
+        self.link_mode = link_mode
+        self.checksum = checksum
+        self.graph = DependencyGraph()
+        self.sources = {}
+        self.mtimes = {}
+
+    def page_output(self, source: Path) -> Path:
+        relative = source.relative_to(self.content_path)
+        return Path.joinpath(self.public_path, relative.parent, f"{source.stem}.html")
+
+    def asset_output(self, source: Path) -> Path:
+        return Path.joinpath(self.public_path, source.relative_to(self.static_path))
+
+    def snapshot(self) -> dict[Path, int]:
+        mtimes = scan_tree(self.content_path)
+        mtimes.update(scan_tree(self.static_path))
+        try:
+            mtimes[self.template_path] = os.stat(self.template_path).st_mtime_ns
+        except OSError:
+            pass
+        return mtimes
+
+    def build(self) -> None:
+        """
+            Build the whole site once and record the dependency graph
+        """
+        self.mtimes = self.snapshot()
+        pages = { self.page_output(path) for path in self.mtimes if path.is_relative_to(self.content_path) }
+        sync_directory_contents(self.static_path, self.public_path, checksum=self.checksum, link_mode=self.link_mode, keep=pages)
+
+        for path in self.mtimes:
+            if path.is_relative_to(self.content_path):
+                self.build_page(path)
+            elif path.is_relative_to(self.static_path):
+                self.graph.add(self.asset_output(path), [path])
+                self.sources[self.asset_output(path)] = path
+
+    def build_page(self, source: Path) -> Path:
+        output = self.page_output(source)
+        self.graph.add(output, [source, self.template_path])
+        self.sources[output] = source
+        try:
+            generate_page(source, self.template_path, output, self.public_path, block_cache=self.block_cache, fragments=self.fragments)
+            self.graph.add(output, [source, self.template_path] + image_dependencies(source))
+        except Exception as e:
+            print(f"Failed to generate page from `{source}`: {e}")
+        return output
+
+    def changed_inputs(self) -> tuple[set[Path], set[Path]]:
+        """
+            Compare a new snapshot with the previous one, returning the (changed or added, removed) inputs
+        """
+        mtimes = self.snapshot()
+        changed = { path for (path, mtime) in mtimes.items() if self.mtimes.get(path) != mtime }
+        removed = set(self.mtimes) - set(mtimes)
+        self.mtimes = mtimes
+        return (changed, removed)
+
+    def rebuild(self, changed: set[Path], removed: set[Path]) -> set[Path]:
+        """
+            Rebuild only the outputs affected by `changed` and `removed` inputs, returning the outputs touched
+        """
+        touched = set()
+
+        # Outputs whose own source was removed go away; others that only used a removed input, such as
+        # pages showing a deleted image, are rebuilt without it
+        outputs = set()
+        for output in self.graph.affected(removed):
+            if self.sources[output] not in removed:
+                outputs.add(output)
+                continue
+            self.graph.remove(output)
+            del self.sources[output]
+            if output.exists():
+                output.unlink()
+            touched.add(output)
+
+        outputs |= self.graph.affected(changed)
+        # Inputs without an output yet are new files; a new image may already be a dependency of a page
+        for path in changed:
+            if path.is_relative_to(self.content_path):
+                output = self.page_output(path)
+            elif path.is_relative_to(self.static_path):
+                output = self.asset_output(path)
+            else:
+                continue
+            if output not in self.sources:
+                outputs.add(output)
+                self.sources[output] = path
+
+        for output in outputs:
+            if output not in self.sources:
+                continue
+            source = self.sources[output]
+            if source.is_relative_to(self.content_path):
+                self.build_page(source)
+            else:
+                output.parent.mkdir(exist_ok=True, parents=True)
+                copy_file(source, output, self.link_mode)
+                self.graph.add(output, [source])
+            touched.add(output)
+
+        return touched
+
+    def run(self, interval: float = 0.1) -> None:
+        """
+            Build once, then poll every `interval` seconds and rebuild what changed until interrupted
+        """
+        self.build()
+        self.report_profile()
+        print(f"Watching `{self.content_path}`, `{self.static_path}` and `{self.template_path}` for changes")
+        try:
+            while True:
+                time.sleep(interval)
+                start = time.perf_counter()
+                (changed, removed) = self.changed_inputs()
+                if len(changed) == 0 and len(removed) == 0:
+                    continue
+                touched = self.rebuild(changed, removed)
+                print(f"Rebuilt {len(touched)} outputs in {(time.perf_counter() - start) * 1000:.1f} ms")
+                self.report_profile()
+        except KeyboardInterrupt:
+            pass
+
+    def report_profile(self) -> None:
+        """
+            With profiling enabled, print the profile of the last build or rebuild and start a new one
+        """
+        if not profiler.enabled:
+            return
+        print(profiler.report())
+        profiler.reset()